@@ -259,6 +259,8 @@ public class AuthController : ControllerBase
         return new JwtSecurityTokenHandler().WriteToken(token);
     }
 
+    private static readonly JsonSerializerOptions _jsonOptions = new() { PropertyNameCaseInsensitive = true };
+
     private async Task<GoogleTokenInfo?> ValidateGoogleTokenAsync(string idToken)
     {
         var client = _httpClientFactory.CreateClient();
@@ -268,9 +270,8 @@ public class AuthController : ControllerBase
         if (!response.IsSuccessStatusCode)
             throw new Exception("Google rejected the token.");
 
-        var json = await response.Content.ReadAsStringAsync();
-        return JsonSerializer.Deserialize<GoogleTokenInfo>(json,
-            new JsonSerializerOptions { PropertyNameCaseInsensitive = true });
+        await using var stream = await response.Content.ReadAsStreamAsync();
+        return await JsonSerializer.DeserializeAsync<GoogleTokenInfo>(stream, _jsonOptions);
     }
 
     private int? GetCurrentUserId()
@@ -129,15 +129,25 @@ public class BotsController : ControllerBase
     {
         var userId = GetUserId();
         var bot = await _context.Bots
-            .FirstOrDefaultAsync(b => b.Id == id && b.UserId == userId);
+            .AsNoTracking()
+            .Where(b => b.Id == id && b.UserId == userId)
+            .Select(b => new { b.Name, b.Status })
+            .FirstOrDefaultAsync();
         if (bot == null) return NotFound();
 
         if (bot.Status == "running")
             return BadRequest(new { message = "No se puede eliminar un bot que está en ejecución." });
 
+        // DELETE directo: sin trackear la entidad ni un SaveChanges aparte.
+        // El filtro por estado cubre un bot que arrancó entre la lectura y el borrado.
+        var deleted = await _context.Bots
+            .Where(b => b.Id == id && b.UserId == userId && b.Status != "running")
+            .ExecuteDeleteAsync();
+        if (deleted == 0)
+            return BadRequest(new { message = "No se puede eliminar un bot que está en ejecución." });
+
+        // Recién ahora: si el DELETE se rechazó, el bot sigue existiendo con su schedule
         _recurringJobs.RemoveIfExists(JobId(id));
-        _context.Bots.Remove(bot);
-        await _context.SaveChangesAsync();
 
         return Ok(new { message = $"Bot '{bot.Name}' eliminado.", botId = id });
     }
@@ -78,13 +78,11 @@ public class PriceAlertsController : ControllerBase
     {
         var userId = GetUserId();
 
-        var alert = await _context.PriceAlerts
-            .FirstOrDefaultAsync(a => a.UserId == userId && a.PropertyId == propertyId);
+        var deleted = await _context.PriceAlerts
+            .Where(a => a.UserId == userId && a.PropertyId == propertyId)
+            .ExecuteDeleteAsync();
 
-        if (alert == null) return NotFound(new { message = "No tenías alerta para esta propiedad." });
-
-        _context.PriceAlerts.Remove(alert);
-        await _context.SaveChangesAsync();
+        if (deleted == 0) return NotFound(new { message = "No tenías alerta para esta propiedad." });
 
         return Ok(new { message = "Alerta desactivada." });
     }
@@ -107,11 +107,12 @@ public class PropertiesController : ControllerBase
     [HttpDelete("{id}")]
     public async Task<IActionResult> DeleteProperty(int id)
     {
-        var property = await _context.Properties.FindAsync(id);
-        if (property == null) return NotFound();
-
-        _context.Properties.Remove(property);
-        await _context.SaveChangesAsync();
+        // Un solo DELETE: los snapshots y alertas caen por el ON DELETE CASCADE
+        // de la base, sin cargar la propiedad antes.
+        var deleted = await _context.Properties
+            .Where(p => p.Id == id)
+            .ExecuteDeleteAsync();
+        if (deleted == 0) return NotFound();
 
         return NoContent();
     }
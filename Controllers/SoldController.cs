@@ -307,10 +307,7 @@ public class SoldController : ControllerBase
     [HttpPost("{id}/mark-sold")]
     public async Task<IActionResult> MarkSold(int id)
     {
-        var property = await _context.Properties.FindAsync(id);
-        if (property == null) return NotFound();
-
-        await _verificationService.MarkAsSoldAsync(id);
+        if (!await _verificationService.MarkAsSoldAsync(id)) return NotFound();
         return Ok(new { propertyId = id, listingStatus = "sold" });
     }
 
@@ -321,10 +318,7 @@ public class SoldController : ControllerBase
     [HttpPost("{id}/mark-active")]
     public async Task<IActionResult> MarkActive(int id)
     {
-        var property = await _context.Properties.FindAsync(id);
-        if (property == null) return NotFound();
-
-        await _verificationService.MarkAsActiveAsync(id);
+        if (!await _verificationService.MarkAsActiveAsync(id)) return NotFound();
         return Ok(new { propertyId = id, listingStatus = "active" });
     }
 }
@@ -112,6 +112,9 @@ public class ApplicationDbContext : DbContext
             entity.HasIndex(b => b.Source).HasDatabaseName("IX_Bots_Source");
             entity.HasIndex(b => b.IsActive).HasDatabaseName("IX_Bots_IsActive");
             entity.HasIndex(b => b.Status).HasDatabaseName("IX_Bots_Status");
+            // Índice parcial para el scheduler: solo guarda filas activas
+            entity.HasIndex(b => b.Status, "IX_Bots_Active_Status")
+                  .HasFilter("\"IsActive\" = true");
         });
 
         // ============ PAYMENT ============
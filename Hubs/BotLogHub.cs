@@ -5,7 +5,7 @@ namespace Inmobiscrap.Hubs;
 
 /// <summary>
 /// Hub de SignalR para transmitir logs de bots en tiempo real.
-/// Al suscribirse, envía el historial en buffer antes de conectar al stream en vivo.
+/// Al suscribirse, conecta al stream en vivo y luego envía el historial en buffer.
 /// </summary>
 public class BotLogHub : Hub
 {
@@ -20,13 +20,13 @@ public class BotLogHub : Hub
 
     public override async Task OnConnectedAsync()
     {
-        _logger.LogInformation($"Client connected: {Context.ConnectionId}");
+        _logger.LogInformation("Client connected: {ConnectionId}", Context.ConnectionId);
         await base.OnConnectedAsync();
     }
 
     public override async Task OnDisconnectedAsync(Exception? exception)
     {
-        _logger.LogInformation($"Client disconnected: {Context.ConnectionId}");
+        _logger.LogInformation("Client disconnected: {ConnectionId}", Context.ConnectionId);
         await base.OnDisconnectedAsync(exception);
     }
 
@@ -34,15 +34,22 @@ public class BotLogHub : Hub
     /// Suscribe al cliente a un canal específico y envía el historial en buffer.
     /// Si botId tiene valor -> Canal del Bot específico.
     /// Si botId es null -> Canal Global (Dashboard).
+    /// Los logs llegan a SignalR a través de la cola de BotLogDispatcher, así que
+    /// una línea puede estar ya en el historial y aún pendiente de envío en vivo.
+    /// Por eso el cliente se agrega al grupo ANTES de tomar el historial (no se
+    /// pierde nada entre ambos) y descarta los mensajes en vivo cuyo Sequence
+    /// sea menor o igual al último del historial (no se duplica nada).
     /// </summary>
     public async Task SubscribeToBot(int? botId)
     {
-        string groupName;
+        string groupName = (botId.HasValue && botId.Value > 0)
+            ? $"Bot_{botId}"
+            : "Dashboard_Global";
+
+        await Groups.AddToGroupAsync(Context.ConnectionId, groupName);
 
         if (botId.HasValue && botId.Value > 0)
         {
-            groupName = $"Bot_{botId}";
-
             // Recuperar historial del bot y enviarlo de una sola vez (ReceiveHistory)
             var history = _logBuffer.GetLogs(botId.Value);
             if (history.Count > 0)
@@ -59,8 +66,6 @@ public class BotLogHub : Hub
         }
         else
         {
-            groupName = "Dashboard_Global";
-
             // Para el dashboard global: historial reciente de todos los bots
             var history = _logBuffer.GetAllRecentLogs(maxPerBot: 100);
             if (history.Count > 0)
@@ -69,10 +74,7 @@ public class BotLogHub : Hub
             }
         }
 
-        // Añadir al grupo DESPUÉS de enviar historial (para recibir eventos en vivo)
-        await Groups.AddToGroupAsync(Context.ConnectionId, groupName);
-
-        _logger.LogInformation($"Client {Context.ConnectionId} joined group {groupName}");
+        _logger.LogInformation("Client {ConnectionId} joined group {GroupName}", Context.ConnectionId, groupName);
     }
 
     /// <summary>
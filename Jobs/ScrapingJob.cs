@@ -1,6 +1,7 @@
 using System;
 using System.Linq;
 using System.Threading.Tasks;
+using Hangfire;
 using Microsoft.EntityFrameworkCore;
 using Microsoft.Extensions.Logging;
 using Inmobiscrap.Data;
@@ -13,6 +14,7 @@ public class ScrapingJob
     private readonly ApplicationDbContext _context;
     private readonly IScraperService _scraperService;
     private readonly ILogger<ScrapingJob> _logger;
+    private readonly IBackgroundJobClient _backgroundJobs;
 
     // ── Únicos estados que permiten ejecución automática ─────────────────────
     // "completed", "running", "stopping" quedan bloqueados intencionalmente.
@@ -23,11 +25,13 @@ public class ScrapingJob
     public ScrapingJob(
         ApplicationDbContext context,
         IScraperService scraperService,
-        ILogger<ScrapingJob> logger)
+        ILogger<ScrapingJob> logger,
+        IBackgroundJobClient backgroundJobs)
     {
         _context = context;
         _scraperService = scraperService;
         _logger = logger;
+        _backgroundJobs = backgroundJobs;
     }
 
     /// <summary>
@@ -64,19 +68,49 @@ public class ScrapingJob
     }
 
     /// <summary>
-    /// Ejecuta todos los bots elegibles (solo idle o error).
+    /// Ejecución encolada por <see cref="ExecuteAllActiveBotsAsync"/>. Entre el
+    /// despacho y el arranque (tras los demás bots de su host) el bot pudo
+    /// desactivarse, completarse o lanzarse a mano, así que se vuelve a exigir
+    /// un estado ejecutable antes de delegar en <see cref="ExecuteBotAsync"/>.
+    /// </summary>
+    public async Task ExecuteScheduledBotAsync(int botId)
+    {
+        var bot = await _context.Bots
+            .AsNoTracking()
+            .Where(b => b.Id == botId)
+            .Select(b => new { b.IsActive, b.Status })
+            .FirstOrDefaultAsync();
+
+        if (bot == null || !bot.IsActive || !_runnableStatuses.Contains(bot.Status))
+        {
+            _logger.LogInformation("Skipping scheduled run of bot {BotId}: no longer eligible (status: {Status})",
+                botId, bot?.Status ?? "not found");
+            return;
+        }
+
+        await ExecuteBotAsync(botId);
+    }
+
+    /// <summary>
+    /// Despacha todos los bots elegibles (solo idle o error).
     /// Bots en completed, running o stopping son ignorados completamente.
-    /// Disparado por Hangfire cada hora.
+    /// Disparado por Hangfire cada hora: encola un job por bot, así los workers
+    /// de Hangfire los ejecutan en paralelo (cada uno con su propio scope y
+    /// DbContext) en vez de uno detrás de otro dentro de este job. Los bots de
+    /// un mismo host sí corren en serie, ver abajo.
     /// </summary>
     public async Task ExecuteAllActiveBotsAsync()
     {
         _logger.LogInformation("Starting scheduled execution of all eligible bots");
 
+        // Solo ID y URL: cada bot se carga en su propio scope al ejecutarse
         var eligibleBots = await _context.Bots
+            .AsNoTracking()
             .Where(b => b.IsActive && _runnableStatuses.Contains(b.Status))
+            .Select(b => new { b.Id, b.Url })
             .ToListAsync();
 
-        if (!eligibleBots.Any())
+        if (eligibleBots.Count == 0)
         {
             _logger.LogInformation("No eligible bots to run (all are completed, running or stopped)");
             return;
@@ -84,20 +118,31 @@ public class ScrapingJob
 
         _logger.LogInformation("Found {Count} eligible bot(s) to run", eligibleBots.Count);
 
+        // Bots del mismo host no corren a la vez: cada uno se encadena como
+        // continuación del anterior. Además de no gatillar rate-limits del portal,
+        // así cada ejecución ve las propiedades que guardó la anterior
+        // (Fingerprint/SourceUrl no son únicos: dos bots con listados solapados
+        // insertarían la misma propiedad dos veces). Un escalón fijo no alcanza,
+        // una ejecución con Playwright + Bedrock dura varios minutos.
+        // OnAnyFinishedState: si un bot falla o su job se borra, la cadena sigue.
+        var lastJobByHost = new Dictionary<string, string>(StringComparer.OrdinalIgnoreCase);
+        var chained = 0;
+
         foreach (var bot in eligibleBots)
         {
-            try
-            {
-                _logger.LogInformation("Executing bot '{BotName}' (ID: {BotId})", bot.Name, bot.Id);
-                await _scraperService.ScrapePropertiesAsync(bot);
-            }
-            catch (Exception ex)
-            {
-                _logger.LogError(ex, "Error executing bot '{BotName}' (ID: {BotId})", bot.Name, bot.Id);
-                // Continuar con el siguiente bot aunque este falle
-            }
+            var host = Uri.TryCreate(bot.Url, UriKind.Absolute, out var uri) ? uri.Host : bot.Url;
+            var botId = bot.Id;
+
+            lastJobByHost[host] = lastJobByHost.TryGetValue(host, out var previousJobId)
+                ? _backgroundJobs.ContinueJobWith<ScrapingJob>(previousJobId,
+                    job => job.ExecuteScheduledBotAsync(botId), JobContinuationOptions.OnAnyFinishedState)
+                : _backgroundJobs.Enqueue<ScrapingJob>(job => job.ExecuteScheduledBotAsync(botId));
+
+            if (previousJobId != null) chained++;
         }
 
-        _logger.LogInformation("Finished scheduled execution");
+        _logger.LogInformation("Enqueued {Count} bot run(s) across {Hosts} host(s), {Chained} chained behind a same-host run",
+            eligibleBots.Count, lastJobByHost.Count, chained);
     }
-}
\ No newline at end of file
+
+}
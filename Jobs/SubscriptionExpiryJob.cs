@@ -27,10 +27,14 @@ public class SubscriptionExpiryJob
         // This covers two cases:
         //   1. Cancelled subscriptions (MpSubscriptionId == null) that reached their expiry date.
         //   2. Active subscriptions where MP failed to renew and the date passed.
+        // Foto previa (sin trackear) solo con lo que se loguea: se toma antes del
+        // UPDATE, así los logs muestran la fecha de billing original.
         var overdueUsers = await _context.Users
+            .AsNoTracking()
             .Where(u => u.Plan == "pro"
                      && u.NextBillingDate != null
                      && u.NextBillingDate < now)
+            .Select(u => new { u.Id, u.Email, u.CreditsBeforePro, u.NextBillingDate })
             .ToListAsync();
 
         if (!overdueUsers.Any())
@@ -41,21 +45,40 @@ public class SubscriptionExpiryJob
 
         _logger.LogInformation("SubscriptionExpiry: {Count} suscripción(es) vencida(s).", overdueUsers.Count);
 
-        foreach (var user in overdueUsers)
-        {
-            var restored = user.CreditsBeforePro ?? 50;
-            user.Plan             = "base";
-            user.Credits          = restored;
-            user.CreditsBeforePro = null;
-            user.MpSubscriptionId = null;
-            user.NextBillingDate  = null;
+        // Un solo UPDATE para todo el lote; los créditos se restauran en SQL.
+        // Se repite la condición completa de vencimiento: una renovación entre la
+        // lectura y el UPDATE mueve NextBillingDate (no Plan), y ese usuario no
+        // debe degradarse.
+        var ids = overdueUsers.Select(u => u.Id).ToList();
+        var degraded = await _context.Users
+            .Where(u => ids.Contains(u.Id)
+                     && u.Plan == "pro"
+                     && u.NextBillingDate != null
+                     && u.NextBillingDate < now)
+            .ExecuteUpdateAsync(s => s
+                .SetProperty(u => u.Plan,             "base")
+                .SetProperty(u => u.Credits,          u => u.CreditsBeforePro ?? 50)
+                .SetProperty(u => u.CreditsBeforePro, (int?)null)
+                .SetProperty(u => u.MpSubscriptionId, (string?)null)
+                .SetProperty(u => u.NextBillingDate,  (DateTime?)null));
 
+        // Loguear solo los que efectivamente quedaron degradados: los que
+        // renovaron en el intervalo siguen en pro y se omiten.
+        var degradedIds = degraded == overdueUsers.Count
+            ? ids.ToHashSet()
+            : (await _context.Users
+                .AsNoTracking()
+                .Where(u => ids.Contains(u.Id) && u.Plan == "base" && u.NextBillingDate == null)
+                .Select(u => u.Id)
+                .ToListAsync()).ToHashSet();
+
+        foreach (var user in overdueUsers.Where(u => degradedIds.Contains(u.Id)))
+        {
             _logger.LogWarning(
                 "SubscriptionExpiry: usuario {UserId} ({Email}) degradado a base ({Credits} créditos). Última billing: {Date}",
-                user.Id, user.Email, restored, user.NextBillingDate);
+                user.Id, user.Email, user.CreditsBeforePro ?? 50, user.NextBillingDate);
         }
 
-        await _context.SaveChangesAsync();
-        _logger.LogInformation("SubscriptionExpiry: {Count} usuario(s) degradado(s).", overdueUsers.Count);
+        _logger.LogInformation("SubscriptionExpiry: {Count} usuario(s) degradado(s).", degraded);
     }
 }
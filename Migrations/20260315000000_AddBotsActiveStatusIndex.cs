@@ -0,0 +1,28 @@
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace Inmobiscrap.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddBotsActiveStatusIndex : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateIndex(
+                name: "IX_Bots_Active_Status",
+                table: "Bots",
+                column: "Status",
+                filter: "\"IsActive\" = true");
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropIndex(
+                name: "IX_Bots_Active_Status",
+                table: "Bots");
+        }
+    }
+}
@@ -0,0 +1,34 @@
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace Inmobiscrap.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddPropertyTrigramIndexes : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            // Índices de trigramas sobre lower(...): los fallbacks del upsert buscan
+            // por substring (LIKE '%...%') en SourceUrl y Title, que un btree no cubre.
+            // Son índices de expresión, así que no forman parte del modelo de EF.
+            migrationBuilder.Sql("CREATE EXTENSION IF NOT EXISTS pg_trgm;");
+
+            migrationBuilder.Sql(
+                "CREATE INDEX IF NOT EXISTS \"IX_Properties_SourceUrl_Trgm\" " +
+                "ON \"Properties\" USING gin (lower(\"SourceUrl\") gin_trgm_ops);");
+
+            migrationBuilder.Sql(
+                "CREATE INDEX IF NOT EXISTS \"IX_Properties_Title_Trgm\" " +
+                "ON \"Properties\" USING gin (lower(\"Title\") gin_trgm_ops);");
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.Sql("DROP INDEX IF EXISTS \"IX_Properties_Title_Trgm\";");
+            migrationBuilder.Sql("DROP INDEX IF EXISTS \"IX_Properties_SourceUrl_Trgm\";");
+        }
+    }
+}
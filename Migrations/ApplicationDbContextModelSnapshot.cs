@@ -108,6 +108,9 @@ namespace Inmobiscrap.Migrations
                     b.HasIndex("Status")
                         .HasDatabaseName("IX_Bots_Status");
 
+                    b.HasIndex(new[] { "Status" }, "IX_Bots_Active_Status")
+                        .HasFilter("\"IsActive\" = true");
+
                     b.HasIndex("UserId")
                         .HasDatabaseName("IX_Bots_UserId");
 
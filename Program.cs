@@ -1,3 +1,5 @@
+using System.IO.Compression;
+using System.Net;
 using System.Text;
 using Inmobiscrap.Data;
 using Inmobiscrap.Services;
@@ -5,7 +7,9 @@ using Inmobiscrap.Jobs;
 using Inmobiscrap.Hubs;
 using Inmobiscrap.Filters;
 using Microsoft.EntityFrameworkCore;
+using Npgsql;
 using Microsoft.AspNetCore.Authentication.JwtBearer;
+using Microsoft.AspNetCore.ResponseCompression;
 using Microsoft.IdentityModel.Tokens;
 using Microsoft.OpenApi.Models;
 using Hangfire;
@@ -48,7 +52,18 @@ builder.Services.AddCors(options =>
 var connectionString = Environment.GetEnvironmentVariable("DB_CONNECTION_STRING")
     ?? builder.Configuration.GetConnectionString("DefaultConnection");
 
-builder.Services.AddDbContext<ApplicationDbContext>(options =>
+// Npgsql ya reutiliza conexiones físicas (Pooling=true por defecto). Se agrega
+// keepalive TCP para que las conexiones ociosas del pool entre ejecuciones de
+// jobs no las corte un NAT/firewall y haya que volver a pagar el handshake.
+// Si la cadena de conexión ya trae Keepalive, se respeta.
+var npgsqlBuilder = new NpgsqlConnectionStringBuilder(connectionString);
+if (npgsqlBuilder.KeepAlive == 0)
+    npgsqlBuilder.KeepAlive = 30;
+connectionString = npgsqlBuilder.ConnectionString;
+
+// Pool de DbContext: cada request/job reutiliza una instancia ya construida
+// (el contexto no tiene estado propio además de las opciones).
+builder.Services.AddDbContextPool<ApplicationDbContext>(options =>
     options.UseNpgsql(connectionString));
 
 // ── JWT AUTHENTICATION ────────────────────────────────────────────────────────
@@ -106,22 +121,76 @@ if (string.IsNullOrEmpty(awsAccessKey) || string.IsNullOrEmpty(awsSecretKey))
     throw new InvalidOperationException("AWS credentials not found.");
 
 var credentials = new BasicAWSCredentials(awsAccessKey, awsSecretKey);
+// Un único cliente para todo el proceso: el SDK mantiene su HttpClient y el pool
+// de conexiones TLS hacia Bedrock vivos entre bots y chunks. Sin reintentos del
+// SDK: ProcessChunkWithBedrock ya reintenta con backoff y jitter, y apilar ambos
+// multiplicaría las llamadas justo cuando Bedrock está pidiendo bajar el ritmo.
 builder.Services.AddSingleton<IAmazonBedrockRuntime>(
-    new AmazonBedrockRuntimeClient(credentials, Amazon.RegionEndpoint.GetBySystemName(awsRegion)));
+    new AmazonBedrockRuntimeClient(credentials, new AmazonBedrockRuntimeConfig
+    {
+        RegionEndpoint          = Amazon.RegionEndpoint.GetBySystemName(awsRegion),
+        MaxConnectionsPerServer = 8,
+        MaxErrorRetry           = 0,
+    }));
 
 // ── HANGFIRE ──────────────────────────────────────────────────────────────────
 builder.Services.AddHangfire(cfg => cfg
     .SetDataCompatibilityLevel(CompatibilityLevel.Version_180)
     .UseSimpleAssemblyNameTypeSerializer()
     .UseRecommendedSerializerSettings()
-    .UsePostgreSqlStorage(opts => opts.UseNpgsqlConnection(connectionString)));
+    .UsePostgreSqlStorage(opts => opts.UseNpgsqlConnection(connectionString))
+    // Los jobs son fire-and-forget (no devuelven resultado): no hace falta
+    // conservar 24h los registros de jobs terminados en la base.
+    // Va después del storage: se aplica sobre el JobStorage configurado.
+    .WithJobExpirationTimeout(TimeSpan.FromHours(1)));
 
 builder.Services.AddHangfireServer();
 
 // ── SERVICES ──────────────────────────────────────────────────────────────────
 builder.Services.AddHttpClient();
+
+const string browserUserAgent =
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36";
+
+// Cliente del scraper: conexiones (y handshakes TLS) reutilizadas entre
+// ejecuciones de bots, HTTP/2 cuando el sitio lo ofrece y respuestas comprimidas.
+builder.Services.AddHttpClient(ScraperService.HttpClientName, client =>
+    {
+        client.DefaultRequestHeaders.UserAgent.ParseAdd(browserUserAgent);
+        client.DefaultRequestHeaders.AcceptLanguage.ParseAdd("es-CL,es;q=0.9");
+        client.DefaultRequestVersion = HttpVersion.Version20;
+        client.DefaultVersionPolicy  = HttpVersionPolicy.RequestVersionOrLower;
+    })
+    .ConfigurePrimaryHttpMessageHandler(() => new SocketsHttpHandler
+    {
+        AutomaticDecompression   = DecompressionMethods.All,
+        PooledConnectionLifetime = TimeSpan.FromMinutes(5), // refresca DNS sin reciclar el handler
+        MaxConnectionsPerServer  = 16,
+    })
+    .SetHandlerLifetime(Timeout.InfiniteTimeSpan);
+
+// Verificación de propiedades: mismo pool persistente, pero sin seguir
+// redirects para detectar 301 → homepage (propiedad vendida). En un 200 su
+// body es el que se analiza, así que pide la página igual que el scraper.
+builder.Services.AddHttpClient(PropertyVerificationService.NoRedirectHttpClientName, client =>
+    {
+        client.DefaultRequestHeaders.UserAgent.ParseAdd(browserUserAgent);
+        client.DefaultRequestHeaders.AcceptLanguage.ParseAdd("es-CL,es;q=0.9");
+        client.Timeout = TimeSpan.FromSeconds(25);
+    })
+    .ConfigurePrimaryHttpMessageHandler(() => new SocketsHttpHandler
+    {
+        AllowAutoRedirect        = false,
+        AutomaticDecompression   = DecompressionMethods.All,
+        PooledConnectionLifetime = TimeSpan.FromMinutes(5),
+    })
+    .SetHandlerLifetime(Timeout.InfiniteTimeSpan);
+builder.Services.AddMemoryCache();
 builder.Services.AddSignalR();
 builder.Services.AddSingleton<IBotLogBuffer, BotLogBuffer>();
+builder.Services.AddSingleton<BotLogDispatcher>();
+builder.Services.AddSingleton<IBotLogDispatcher>(sp => sp.GetRequiredService<BotLogDispatcher>());
+builder.Services.AddHostedService(sp => sp.GetRequiredService<BotLogDispatcher>());
 builder.Services.AddScoped<IScraperService, ScraperService>();
 builder.Services.AddScoped<IBotLogService, BotLogService>();
 builder.Services.AddScoped<IPropertyUpsertService, PropertyUpsertService>();
@@ -138,6 +207,18 @@ builder.Services.AddScoped<DevelopmentOnlyFilter>();
 builder.Services.AddControllers();
 builder.Services.AddEndpointsApiExplorer();
 
+// ── RESPONSE COMPRESSION ─────────────────────────────────────────────────────
+// Los listados de propiedades y los endpoints de analytics devuelven JSON de
+// cientos de KB; Brotli/Gzip en nivel Fastest lo reduce varias veces con un
+// costo de CPU mínimo. Solo aplica a los MIME por defecto (JSON, texto).
+builder.Services.AddResponseCompression(options =>
+{
+    options.Providers.Add<BrotliCompressionProvider>();
+    options.Providers.Add<GzipCompressionProvider>();
+});
+builder.Services.Configure<BrotliCompressionProviderOptions>(o => o.Level = CompressionLevel.Fastest);
+builder.Services.Configure<GzipCompressionProviderOptions>(o => o.Level = CompressionLevel.Fastest);
+
 
 // ── SWAGGER con JWT Bearer ────────────────────────────────────────────────────
 // FIX: usar SecuritySchemeType.Http + Scheme "bearer" en vez de ApiKey.
@@ -205,20 +286,18 @@ using (var scope = app.Services.CreateScope())
     {
         var db = scope.ServiceProvider.GetRequiredService<ApplicationDbContext>();
 
-        var stuckBots = await db.Bots
+        // Un solo UPDATE: no hace falta cargar los bots para resetearlos
+        var now = DateTime.UtcNow;
+        var resetCount = await db.Bots
             .Where(b => b.Status == "running" || b.Status == "stopping")
-            .ToListAsync();
+            .ExecuteUpdateAsync(s => s
+                .SetProperty(b => b.Status,    "idle")
+                .SetProperty(b => b.UpdatedAt, now)
+                .SetProperty(b => b.LastError, "Estado reseteado: proceso interrumpido por reinicio del servidor."));
 
-        if (stuckBots.Any())
+        if (resetCount > 0)
         {
-            foreach (var bot in stuckBots)
-            {
-                bot.Status    = "idle";
-                bot.UpdatedAt = DateTime.UtcNow;
-                bot.LastError = "Estado reseteado: proceso interrumpido por reinicio del servidor.";
-            }
-            await db.SaveChangesAsync();
-            Console.WriteLine($"⚠️  Reset {stuckBots.Count} bot(s) zombie → idle.");
+            Console.WriteLine($"⚠️  Reset {resetCount} bot(s) zombie → idle.");
         }
         else
         {
@@ -277,7 +356,12 @@ using (var scope = app.Services.CreateScope())
         var db            = scope.ServiceProvider.GetRequiredService<ApplicationDbContext>();
         var recurringJobs = scope.ServiceProvider.GetRequiredService<IRecurringJobManager>();
 
-        var allBots = await db.Bots.ToListAsync();
+        // Solo las columnas que decide el schedule, sin trackear: al arrancar no
+        // hace falta materializar las entidades completas para registrar jobs.
+        var allBots = await db.Bots
+            .AsNoTracking()
+            .Select(b => new { b.Id, b.IsActive, b.ScheduleEnabled, b.CronExpression })
+            .ToListAsync();
 
         int registered = 0;
         int removed    = 0;
@@ -321,6 +405,7 @@ if (app.Environment.IsDevelopment())
     app.UseHangfireDashboard("/hangfire");
 }
 
+app.UseResponseCompression();
 app.UseCors("AllowLocalhost");
 app.UseHttpsRedirection();
 
@@ -3,13 +3,17 @@ namespace Inmobiscrap.Services;
 /// <summary>
 /// Entrada de log almacenada en el buffer de memoria.
 /// Las propiedades en PascalCase serán enviadas como camelCase por SignalR.
+/// Sequence lo asigna el buffer al agregar (creciente, global): el cliente
+/// descarta los mensajes en vivo con Sequence menor o igual al último que
+/// recibió en ReceiveHistory, que ya los incluía.
 /// </summary>
 public record BotLogEntry(
     string Level,
     string Message,
     DateTime Timestamp,
     int BotId,
-    string BotName);
+    string BotName,
+    long Sequence = 0);
 
 /// <summary>
 /// Entrada de progreso almacenada en el buffer de memoria.
@@ -25,8 +29,8 @@ public record BotProgressEntry(
 
 public interface IBotLogBuffer
 {
-    /// <summary>Agrega un log al buffer del bot.</summary>
-    void AddLog(BotLogEntry entry);
+    /// <summary>Agrega un log al buffer del bot y lo retorna con su Sequence asignado.</summary>
+    BotLogEntry AddLog(BotLogEntry entry);
 
     /// <summary>Actualiza el último estado de progreso del bot.</summary>
     void SetProgress(BotProgressEntry entry);
@@ -51,31 +55,39 @@ public interface IBotLogBuffer
 
 /// <summary>
 /// Buffer en memoria thread-safe que guarda los últimos N logs por bot.
+/// Cada bot usa un ring buffer (Queue) de capacidad fija: agregar un log y
+/// descartar el más antiguo son O(1).
 /// Registrado como Singleton para persistir entre requests y conexiones.
 /// </summary>
 public class BotLogBuffer : IBotLogBuffer
 {
     private const int MaxLogsPerBot = 1000;
 
-    private readonly Dictionary<int, List<BotLogEntry>> _logs = new();
+    private readonly Dictionary<int, Queue<BotLogEntry>> _logs = new();
     private readonly Dictionary<int, BotProgressEntry?> _progress = new();
     private readonly object _lock = new();
+    private long _lastSequence;
 
-    public void AddLog(BotLogEntry entry)
+    public BotLogEntry AddLog(BotLogEntry entry)
     {
         lock (_lock)
         {
-            if (!_logs.TryGetValue(entry.BotId, out var list))
+            // Bajo el lock: el historial de cualquier snapshot es siempre un
+            // prefijo de la secuencia, sin huecos.
+            entry = entry with { Sequence = ++_lastSequence };
+
+            if (!_logs.TryGetValue(entry.BotId, out var ring))
             {
-                list = new List<BotLogEntry>(MaxLogsPerBot);
-                _logs[entry.BotId] = list;
+                ring = new Queue<BotLogEntry>(MaxLogsPerBot);
+                _logs[entry.BotId] = ring;
             }
 
-            list.Add(entry);
+            // Ventana deslizante: descartar el más antiguo al llegar al límite
+            if (ring.Count >= MaxLogsPerBot)
+                ring.Dequeue();
 
-            // Ventana deslizante: eliminar el más antiguo si se supera el límite
-            if (list.Count > MaxLogsPerBot)
-                list.RemoveAt(0);
+            ring.Enqueue(entry);
+            return entry;
         }
     }
 
@@ -91,8 +103,8 @@ public class BotLogBuffer : IBotLogBuffer
     {
         lock (_lock)
         {
-            return _logs.TryGetValue(botId, out var list)
-                ? list.ToList()
+            return _logs.TryGetValue(botId, out var ring)
+                ? ring.ToArray()
                 : Array.Empty<BotLogEntry>();
         }
     }
@@ -110,7 +122,7 @@ public class BotLogBuffer : IBotLogBuffer
         lock (_lock)
         {
             return _logs.Values
-                .SelectMany(list => list.TakeLast(maxPerBot))
+                .SelectMany(ring => ring.TakeLast(maxPerBot))
                 .OrderBy(e => e.Timestamp)
                 .ToList();
         }
@@ -120,7 +132,8 @@ public class BotLogBuffer : IBotLogBuffer
     {
         lock (_lock)
         {
-            _logs[botId] = new List<BotLogEntry>(MaxLogsPerBot);
+            if (_logs.TryGetValue(botId, out var ring))
+                ring.Clear();
             _progress.Remove(botId);
         }
     }
@@ -0,0 +1,69 @@
+using System.Threading.Channels;
+using Microsoft.AspNetCore.SignalR;
+using Inmobiscrap.Hubs;
+
+namespace Inmobiscrap.Services;
+
+public interface IBotLogDispatcher
+{
+    /// <summary>
+    /// Encola un mensaje SignalR para el grupo del bot y el dashboard global.
+    /// No bloquea: el envío real lo hace un único consumidor en segundo plano.
+    /// </summary>
+    void Enqueue(int botId, string method, object payload);
+}
+
+/// <summary>
+/// Cola en memoria entre el scraper y SignalR. Antes cada log esperaba dos
+/// SendAsync (grupo del bot + dashboard) dentro del loop de scraping; ahora
+/// el productor solo escribe en un Channel y este servicio los despacha en
+/// orden. Si SignalR se atrasa, se descartan los mensajes en vivo más viejos:
+/// el historial completo sigue en <see cref="IBotLogBuffer"/>.
+/// Registrado como Singleton y como HostedService (misma instancia).
+/// </summary>
+public class BotLogDispatcher : BackgroundService, IBotLogDispatcher
+{
+    private const int MaxPendingMessages = 10_000;
+
+    private readonly Channel<(int BotId, string Method, object Payload)> _channel =
+        Channel.CreateBounded<(int, string, object)>(new BoundedChannelOptions(MaxPendingMessages)
+        {
+            SingleReader = true,
+            FullMode     = BoundedChannelFullMode.DropOldest
+        });
+
+    private readonly IHubContext<BotLogHub> _hubContext;
+    private readonly ILogger<BotLogDispatcher> _logger;
+
+    public BotLogDispatcher(IHubContext<BotLogHub> hubContext, ILogger<BotLogDispatcher> logger)
+    {
+        _hubContext = hubContext;
+        _logger = logger;
+    }
+
+    public void Enqueue(int botId, string method, object payload) =>
+        _channel.Writer.TryWrite((botId, method, payload));
+
+    protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+    {
+        await foreach (var (botId, method, payload) in _channel.Reader.ReadAllAsync(stoppingToken))
+        {
+            try
+            {
+                // 1. Enviar al grupo ESPECÍFICO del bot (quien mira el detalle)
+                await _hubContext.Clients.Group($"Bot_{botId}").SendAsync(method, payload, stoppingToken);
+
+                // 2. Enviar al grupo GLOBAL (quien mira el dashboard general)
+                await _hubContext.Clients.Group("Dashboard_Global").SendAsync(method, payload, stoppingToken);
+            }
+            catch (OperationCanceledException) when (stoppingToken.IsCancellationRequested)
+            {
+                break;
+            }
+            catch (Exception ex)
+            {
+                _logger.LogError(ex, "Error sending {Method} via SignalR for bot {BotId}", method, botId);
+            }
+        }
+    }
+}
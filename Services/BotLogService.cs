@@ -1,6 +1,3 @@
-using Microsoft.AspNetCore.SignalR;
-using Inmobiscrap.Hubs;
-
 namespace Inmobiscrap.Services;
 
 public interface IBotLogService
@@ -20,16 +17,16 @@ public interface IBotLogService
 
 public class BotLogService : IBotLogService
 {
-    private readonly IHubContext<BotLogHub> _hubContext;
+    private readonly IBotLogDispatcher _dispatcher;
     private readonly ILogger<BotLogService> _logger;
     private readonly IBotLogBuffer _logBuffer;
 
     public BotLogService(
-        IHubContext<BotLogHub> hubContext,
+        IBotLogDispatcher dispatcher,
         ILogger<BotLogService> logger,
         IBotLogBuffer logBuffer)
     {
-        _hubContext = hubContext;
+        _dispatcher = dispatcher;
         _logger = logger;
         _logBuffer = logBuffer;
     }
@@ -54,10 +51,11 @@ public class BotLogService : IBotLogService
     public async Task LogSuccessAsync(int botId, string botName, string message) => 
         await SendLogAsync(botId, botName, "Success", message);
 
-    public async Task SendProgressAsync(int botId, string botName, int current, int total, string? message = null)
+    public Task SendProgressAsync(int botId, string botName, int current, int total, string? message = null)
     {
         var progressMessage = message ?? $"Progress: {current}/{total}";
         var percentage = total > 0 ? (current * 100) / total : 0;
+        var timestamp = DateTime.UtcNow;
 
         // Guardar en buffer (último estado de progreso del bot)
         _logBuffer.SetProgress(new BotProgressEntry(
@@ -67,7 +65,7 @@ public class BotLogService : IBotLogService
             Total: total,
             Percentage: percentage,
             Message: progressMessage,
-            Timestamp: DateTime.UtcNow));
+            Timestamp: timestamp));
 
         var payload = new
         {
@@ -77,21 +75,12 @@ public class BotLogService : IBotLogService
             Total = total,
             Percentage = percentage,
             Message = progressMessage,
-            Timestamp = DateTime.UtcNow
+            Timestamp = timestamp
         };
 
-        try
-        {
-            // 1. Enviar al grupo ESPECÍFICO del bot (quien mira el detalle)
-            await _hubContext.Clients.Group($"Bot_{botId}").SendAsync("ReceiveProgress", payload);
-
-            // 2. Enviar al grupo GLOBAL (quien mira el dashboard general)
-            await _hubContext.Clients.Group("Dashboard_Global").SendAsync("ReceiveProgress", payload);
-        }
-        catch (Exception ex)
-        {
-            _logger.LogError(ex, "Error sending progress update via SignalR");
-        }
+        // Envío a SignalR en segundo plano: el scraper no espera la red
+        _dispatcher.Enqueue(botId, "ReceiveProgress", payload);
+        return Task.CompletedTask;
     }
 
     public void ClearBotLogs(int botId)
@@ -99,32 +88,26 @@ public class BotLogService : IBotLogService
         _logBuffer.Clear(botId);
     }
 
-    private async Task SendLogAsync(int botId, string botName, string level, string message)
+    private Task SendLogAsync(int botId, string botName, string level, string message)
     {
-        try
-        {
-            var entry = new BotLogEntry(
-                Level: level,
-                Message: message,
-                Timestamp: DateTime.UtcNow,
-                BotId: botId,
-                BotName: botName);
-
-            // Guardar en buffer para clientes que se conecten tarde o reconecten
-            _logBuffer.AddLog(entry);
-
-            // 1. Enviar al grupo ESPECÍFICO
-            await _hubContext.Clients.Group($"Bot_{botId}").SendAsync("ReceiveLogMessage", entry);
-
-            // 2. Enviar al grupo GLOBAL
-            await _hubContext.Clients.Group("Dashboard_Global").SendAsync("ReceiveLogMessage", entry);
-
-            // Log interno del servidor
-            _logger.LogInformation($"[Bot {botId}] [{level}] {message}");
-        }
-        catch (Exception ex)
-        {
-            _logger.LogError(ex, $"Error sending log via SignalR for bot {botId}");
-        }
+        var entry = new BotLogEntry(
+            Level: level,
+            Message: message,
+            Timestamp: DateTime.UtcNow,
+            BotId: botId,
+            BotName: botName);
+
+        // Guardar en buffer para clientes que se conecten tarde o reconecten.
+        // Se envía la entrada ya numerada: con Sequence el cliente reconoce lo
+        // que ya le llegó en el historial.
+        entry = _logBuffer.AddLog(entry);
+
+        // Envío a SignalR (grupo del bot + global) en segundo plano, en orden
+        _dispatcher.Enqueue(botId, "ReceiveLogMessage", entry);
+
+        // Log interno del servidor
+        _logger.LogInformation("[Bot {BotId}] [{Level}] {Message}", botId, level, message);
+
+        return Task.CompletedTask;
     }
 }
\ No newline at end of file
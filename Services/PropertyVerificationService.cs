@@ -1,3 +1,4 @@
+using System.Buffers;
 using Microsoft.EntityFrameworkCore;
 using Microsoft.Extensions.Logging;
 using Inmobiscrap.Data;
@@ -27,22 +28,28 @@ public interface IPropertyVerificationService
     /// <summary>Verifica una propiedad individual por ID.</summary>
     Task<VerificationResult> VerifySinglePropertyAsync(int propertyId, CancellationToken ct = default);
 
-    /// <summary>Marca manualmente una propiedad como vendida.</summary>
-    Task MarkAsSoldAsync(int propertyId);
+    /// <summary>Marca manualmente una propiedad como vendida. False si no existe.</summary>
+    Task<bool> MarkAsSoldAsync(int propertyId);
 
-    /// <summary>Marca manualmente una propiedad como activa (falso positivo).</summary>
-    Task MarkAsActiveAsync(int propertyId);
+    /// <summary>Marca manualmente una propiedad como activa (falso positivo). False si no existe.</summary>
+    Task<bool> MarkAsActiveAsync(int propertyId);
 }
 
 public class PropertyVerificationService : IPropertyVerificationService
 {
+    /// <summary>
+    /// Cliente HTTP nombrado que no sigue redirects (configurado en Program.cs).
+    /// </summary>
+    public const string NoRedirectHttpClientName = "verification-noredirect";
+
     private readonly ApplicationDbContext _context;
     private readonly IHttpClientFactory _httpClientFactory;
     private readonly ILogger<PropertyVerificationService> _logger;
 
-    // Palabras clave que indican propiedad vendida/finalizada/reservada
-    private static readonly string[] _soldKeywords = new[]
-    {
+    // Palabras clave que indican propiedad vendida/finalizada/reservada.
+    // SearchValues las busca todas en una sola pasada sobre el body.
+    private static readonly SearchValues<string> _soldKeywords = SearchValues.Create(
+    [
         "vendido", "vendida", "no disponible", "publicación finalizada",
         "publicacion finalizada", "aviso finalizado", "propiedad no encontrada",
         "esta propiedad ya no está disponible", "listing has ended",
@@ -50,7 +57,7 @@ public class PropertyVerificationService : IPropertyVerificationService
         "removed", "expired", "finalizado", "cerrado",
         "reservado", "reservada", "en proceso de venta", "bajo promesa",
         "arrendado", "arrendada", "alquilado", "alquilada",
-    };
+    ], StringComparison.OrdinalIgnoreCase);
 
     private readonly IHubContext<BotLogHub> _hubContext;
 
@@ -110,6 +117,10 @@ public class PropertyVerificationService : IPropertyVerificationService
         {
             if (ct.IsCancellationRequested) break;
 
+            // Rate limiting: 1 request per second. El intervalo corre en paralelo
+            // con la descarga, así la latencia del sitio no se suma al segundo.
+            var pacing = Task.Delay(1000, ct);
+
             var result = await CheckSourceUrlAsync(property.SourceUrl!, ct);
 
             property.LastVerifiedAt = DateTime.UtcNow;
@@ -148,8 +159,7 @@ public class PropertyVerificationService : IPropertyVerificationService
                     break;
             }
 
-            // Rate limiting: 1 request per second
-            await Task.Delay(1000, ct);
+            await pacing;
         }
 
         await _context.SaveChangesAsync(ct);
@@ -192,27 +202,33 @@ public class PropertyVerificationService : IPropertyVerificationService
         return result;
     }
 
-    public async Task MarkAsSoldAsync(int propertyId)
+    // Marcado manual: un solo UPDATE, sin cargar la propiedad completa.
+    // Las filas afectadas indican si la propiedad existía.
+    public async Task<bool> MarkAsSoldAsync(int propertyId)
     {
-        var property = await _context.Properties.FindAsync(propertyId);
-        if (property == null) return;
-
-        property.ListingStatus = "sold";
-        property.SoldDetectedAt = DateTime.UtcNow;
-        property.LastVerifiedAt = DateTime.UtcNow;
-        await _context.SaveChangesAsync();
+        var now = DateTime.UtcNow;
+        var updated = await _context.Properties
+            .Where(p => p.Id == propertyId)
+            .ExecuteUpdateAsync(s => s
+                .SetProperty(p => p.ListingStatus,  "sold")
+                .SetProperty(p => p.SoldDetectedAt, now)
+                .SetProperty(p => p.LastVerifiedAt, now));
+
+        return updated > 0;
     }
 
-    public async Task MarkAsActiveAsync(int propertyId)
+    public async Task<bool> MarkAsActiveAsync(int propertyId)
     {
-        var property = await _context.Properties.FindAsync(propertyId);
-        if (property == null) return;
-
-        property.ListingStatus = "active";
-        property.SoldDetectedAt = null;
-        property.ConsecutiveMisses = 0;
-        property.LastVerifiedAt = DateTime.UtcNow;
-        await _context.SaveChangesAsync();
+        var now = DateTime.UtcNow;
+        var updated = await _context.Properties
+            .Where(p => p.Id == propertyId)
+            .ExecuteUpdateAsync(s => s
+                .SetProperty(p => p.ListingStatus,     "active")
+                .SetProperty(p => p.SoldDetectedAt,    (DateTime?)null)
+                .SetProperty(p => p.ConsecutiveMisses, 0)
+                .SetProperty(p => p.LastVerifiedAt,    now));
+
+        return updated > 0;
     }
 
     // ══════════════════════════════════════════════════════════════════════
@@ -221,22 +237,24 @@ public class PropertyVerificationService : IPropertyVerificationService
 
     private async Task<VerificationResult> CheckSourceUrlAsync(string url, CancellationToken ct)
     {
+        // Con ResponseHeadersRead el Timeout del cliente no cubre la lectura del
+        // body: este token acota la verificación completa a los mismos 25s.
+        using var timeoutCts = CancellationTokenSource.CreateLinkedTokenSource(ct);
+        timeoutCts.CancelAfter(TimeSpan.FromSeconds(25));
+        var token = timeoutCts.Token;
+
         try
         {
-            var client = _httpClientFactory.CreateClient();
-            client.Timeout = TimeSpan.FromSeconds(25);
-            client.DefaultRequestHeaders.UserAgent.ParseAdd(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36");
-            client.DefaultRequestHeaders.AcceptLanguage.ParseAdd("es-CL,es;q=0.9");
+            // Clientes nombrados (Program.cs): el pool de conexiones se comparte
+            // entre verificaciones en vez de abrir un handler nuevo por URL.
+            var client = _httpClientFactory.CreateClient(ScraperService.HttpClientName);
 
             // No seguir redirects automáticamente para detectar 301→homepage
-            var handler = new HttpClientHandler { AllowAutoRedirect = false };
-            using var noRedirectClient = new HttpClient(handler);
-            noRedirectClient.Timeout = TimeSpan.FromSeconds(25);
-            noRedirectClient.DefaultRequestHeaders.UserAgent.ParseAdd(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36");
+            var noRedirectClient = _httpClientFactory.CreateClient(NoRedirectHttpClientName);
 
-            var response = await noRedirectClient.GetAsync(url, ct);
+            // Solo headers: para 404/410/redirects el body no se usa, así que no se
+            // descarga ni se bufferiza. El using devuelve la conexión al pool.
+            using var response = await noRedirectClient.GetAsync(url, HttpCompletionOption.ResponseHeadersRead, token);
             var statusCode = (int)response.StatusCode;
 
             // 404 / 410 → vendida
@@ -251,20 +269,20 @@ public class PropertyVerificationService : IPropertyVerificationService
                     return VerificationResult.Sold;
 
                 // Seguir el redirect y analizar el contenido
-                var finalResponse = await client.GetAsync(url, ct);
+                using var finalResponse = await client.GetAsync(url, HttpCompletionOption.ResponseHeadersRead, token);
                 if (!finalResponse.IsSuccessStatusCode)
                     return VerificationResult.Sold;
 
-                var body = await finalResponse.Content.ReadAsStringAsync(ct);
+                var body = await finalResponse.Content.ReadAsStringAsync(token);
                 return ContainsSoldKeywords(body) ? VerificationResult.Sold : VerificationResult.StillActive;
             }
 
             // 200 OK — verificar contenido
             if (response.IsSuccessStatusCode)
             {
-                // Re-descargar con redirect habilitado para obtener el body
-                var fullResponse = await client.GetAsync(url, ct);
-                var body = await fullResponse.Content.ReadAsStringAsync(ct);
+                // Sin redirect de por medio: el body de esta misma respuesta ya es
+                // la página final, no hace falta volver a descargarla.
+                var body = await response.Content.ReadAsStringAsync(token);
 
                 // Detectar Cloudflare/captcha challenge → no es indicador de venta
                 if (IsWafOrCaptchaPage(body))
@@ -283,7 +301,7 @@ public class PropertyVerificationService : IPropertyVerificationService
             // Otros status codes (5xx, etc.)
             return VerificationResult.NetworkError;
         }
-        catch (TaskCanceledException)
+        catch (OperationCanceledException)
         {
             return VerificationResult.NetworkError;
         }
@@ -298,6 +316,12 @@ public class PropertyVerificationService : IPropertyVerificationService
         }
     }
 
+    // Rutas de búsqueda/listados a las que los portales redirigen avisos dados
+    // de baja. Agregar un portal nuevo es sumar un marcador aquí.
+    private static readonly SearchValues<string> _listingPathMarkers = SearchValues.Create(
+        ["/buscar", "/search", "/resultados", "/listings"],
+        StringComparison.Ordinal);
+
     private static bool IsRedirectToHomepage(string originalUrl, string redirectLocation)
     {
         if (string.IsNullOrWhiteSpace(redirectLocation)) return false;
@@ -311,31 +335,24 @@ public class PropertyVerificationService : IPropertyVerificationService
                 return true;
 
             // Redirige a una página genérica de búsqueda/listados
-            if (redirectPath.Contains("/buscar") || redirectPath.Contains("/search")
-                || redirectPath.Contains("/resultados") || redirectPath.Contains("/listings"))
+            if (redirectPath.AsSpan().ContainsAny(_listingPathMarkers))
                 return true;
         }
 
         return false;
     }
 
-    private static bool ContainsSoldKeywords(string htmlBody)
-    {
-        var lower = htmlBody.ToLowerInvariant();
-        return _soldKeywords.Any(keyword => lower.Contains(keyword));
-    }
+    private static bool ContainsSoldKeywords(string htmlBody) =>
+        htmlBody.AsSpan().ContainsAny(_soldKeywords);
 
-    private static bool IsWafOrCaptchaPage(string htmlBody)
-    {
-        var lower = htmlBody.ToLowerInvariant();
-        return lower.Contains("cf-browser-verification")
-            || lower.Contains("cloudflare")
-            || lower.Contains("captcha")
-            || lower.Contains("recaptcha")
-            || lower.Contains("hcaptcha")
-            || lower.Contains("challenge-platform")
-            || lower.Contains("just a moment");
-    }
+    // "captcha" ya cubre recaptcha/hcaptcha. Una sola pasada case-insensitive,
+    // sin copiar el body a minúsculas.
+    private static readonly SearchValues<string> _wafMarkers = SearchValues.Create(
+        ["cf-browser-verification", "cloudflare", "captcha", "challenge-platform", "just a moment"],
+        StringComparison.OrdinalIgnoreCase);
+
+    private static bool IsWafOrCaptchaPage(string htmlBody) =>
+        htmlBody.AsSpan().ContainsAny(_wafMarkers);
 
     private async Task BroadcastVerificationLog(string message)
     {
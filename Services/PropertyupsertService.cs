@@ -1,6 +1,6 @@
+using System.Globalization;
 using System.Security.Cryptography;
 using System.Text;
-using System.Text.RegularExpressions;
 using Microsoft.EntityFrameworkCore;
 using Inmobiscrap.Data;
 using Inmobiscrap.Models;
@@ -16,7 +16,21 @@ public enum UpsertResult
 
 public interface IPropertyUpsertService
 {
+    /// <summary>
+    /// Deja la propiedad y su snapshot agregados/modificados en el DbContext,
+    /// sin guardar. El llamador hace SaveChangesAsync por lotes.
+    /// </summary>
     Task<UpsertResult> UpsertPropertyAsync(Property scraped, int botId);
+
+    /// <summary>
+    /// Carga en el contexto, con una sola consulta, las propiedades existentes
+    /// cuyos fingerprints coinciden con el lote. Los upserts siguientes del
+    /// lote las resuelven en memoria en vez de hacer un SELECT cada uno.
+    /// Deja el fingerprint calculado en cada propiedad del lote, y el upsert lo
+    /// reutiliza: no modificar SourceUrl/Title/etc. entre el prefetch y el upsert.
+    /// </summary>
+    Task PrefetchByFingerprintAsync(IReadOnlyCollection<Property> scraped);
+
     string GenerateFingerprint(Property property);
 }
 
@@ -28,12 +42,18 @@ public interface IPropertyUpsertService
 ///      propiedades sin URL que el LLM extrajo con variaciones menores).
 ///   4. Si NO existe → la crea + primer snapshot.
 ///   5. Si SÍ existe → SIEMPRE crea un nuevo snapshot.
+/// No llama a SaveChanges: los cambios de un lote de propiedades se envían
+/// juntos (EF agrupa los INSERT/UPDATE en pocos round-trips).
 /// </summary>
 public class PropertyUpsertService : IPropertyUpsertService
 {
     private readonly ApplicationDbContext _context;
     private readonly ILogger<PropertyUpsertService> _logger;
 
+    // Fingerprints ya consultados en la base por PrefetchByFingerprintAsync:
+    // si no están en Local, se sabe que no existen y se omite el SELECT.
+    private readonly HashSet<string> _prefetchedFingerprints = new();
+
     public PropertyUpsertService(
         ApplicationDbContext context,
         ILogger<PropertyUpsertService> logger)
@@ -49,33 +69,75 @@ public class PropertyUpsertService : IPropertyUpsertService
     /// quitar acentos, quitar puntuación.
     /// "  Edificio en Las Condes  " → "edificio en las condes"
     /// "Edificio, Las Condes!" → "edificio las condes"
+    /// Una sola pasada sobre los caracteres (equivale a ToLowerInvariant +
+    /// reemplazo de acentos + [^\w\s]→" " + \s+→" " + Trim). Se usa en el
+    /// fingerprint, así que cualquier cambio de resultado rompe el matching.
     /// </summary>
-    private static string NormalizeText(string? text)
+    internal static string NormalizeText(string? text)
     {
         if (string.IsNullOrWhiteSpace(text)) return "";
-        var s = text.Trim().ToLowerInvariant();
-        // Quitar acentos comunes del español
-        s = s.Replace("á", "a").Replace("é", "e").Replace("í", "i")
-             .Replace("ó", "o").Replace("ú", "u").Replace("ñ", "n")
-             .Replace("ü", "u");
-        // Quitar puntuación y caracteres especiales
-        s = Regex.Replace(s, @"[^\w\s]", " ");
-        // Colapsar espacios múltiples
-        s = Regex.Replace(s, @"\s+", " ").Trim();
-        return s;
+
+        Span<char> buffer = text.Length <= 256 ? stackalloc char[text.Length] : new char[text.Length];
+        int length = 0;
+        bool pendingSpace = false;
+
+        foreach (var raw in text)
+        {
+            var c = char.ToLowerInvariant(raw) switch
+            {
+                'á' => 'a', 'é' => 'e', 'í' => 'i', 'ó' => 'o', 'ú' => 'u',
+                'ñ' => 'n', 'ü' => 'u',
+                var other => other
+            };
+
+            // Puntuación y whitespace actúan igual: separan palabras
+            if (!IsWordChar(c))
+            {
+                pendingSpace = true;
+                continue;
+            }
+
+            if (pendingSpace && length > 0)
+                buffer[length++] = ' ';
+            pendingSpace = false;
+            buffer[length++] = c;
+        }
+
+        return new string(buffer[..length]);
+    }
+
+    /// <summary>Mismo conjunto que \w en .NET Regex.</summary>
+    private static bool IsWordChar(char c)
+    {
+        if (char.IsAscii(c))
+            return char.IsAsciiLetterOrDigit(c) || c == '_';
+
+        return char.GetUnicodeCategory(c) switch
+        {
+            UnicodeCategory.UppercaseLetter or UnicodeCategory.LowercaseLetter or
+            UnicodeCategory.TitlecaseLetter or UnicodeCategory.ModifierLetter or
+            UnicodeCategory.OtherLetter or UnicodeCategory.NonSpacingMark or
+            UnicodeCategory.DecimalDigitNumber or UnicodeCategory.ConnectorPunctuation => true,
+            _ => false
+        };
     }
 
     // ── Fingerprint ───────────────────────────────────────────────────────────
 
     public string GenerateFingerprint(Property property)
     {
+        // Cultura invariante: con la cultura del host (p.ej. es-CL) el Area 85.5
+        // se formateaba "85,5" y la misma propiedad sin URL cambiaba de
+        // fingerprint según la máquina que corría el bot. Los contenedores
+        // corren sin LANG (cultura invariante), así que los existentes no cambian.
         var raw = !string.IsNullOrWhiteSpace(property.SourceUrl)
             ? property.SourceUrl.Trim().ToLowerInvariant()
-            : $"{NormalizeText(property.Title)}|" +
-              $"{NormalizeText(property.City)}|" +
-              $"{NormalizeText(property.PropertyType)}|" +
-              $"{property.Bedrooms ?? 0}|" +
-              $"{property.Area ?? 0}";
+            : string.Create(CultureInfo.InvariantCulture,
+                $"{NormalizeText(property.Title)}|" +
+                $"{NormalizeText(property.City)}|" +
+                $"{NormalizeText(property.PropertyType)}|" +
+                $"{property.Bedrooms ?? 0}|" +
+                $"{property.Area ?? 0}");
 
         // Normalizar URLs: quitar query params, fragments y trailing slashes
         if (raw.StartsWith("http"))
@@ -88,8 +150,21 @@ public class PropertyUpsertService : IPropertyUpsertService
             catch { /* dejar tal cual si la URL es inválida */ }
         }
 
-        var bytes = SHA256.HashData(Encoding.UTF8.GetBytes(raw));
-        return Convert.ToHexString(bytes).ToLowerInvariant();
+        // SHA256 se mantiene: los fingerprints ya guardados en la base dependen
+        // de él. Se evitan en cambio las copias intermedias (arreglos del
+        // input y del hash, y el hex en mayúsculas que luego se bajaba).
+        Span<byte> hash = stackalloc byte[SHA256.HashSizeInBytes];
+        if (raw.Length <= 256)
+        {
+            Span<byte> utf8 = stackalloc byte[Encoding.UTF8.GetMaxByteCount(raw.Length)];
+            SHA256.HashData(utf8[..Encoding.UTF8.GetBytes(raw, utf8)], hash);
+        }
+        else
+        {
+            SHA256.HashData(Encoding.UTF8.GetBytes(raw), hash);
+        }
+
+        return Convert.ToHexStringLower(hash);
     }
 
     private static string NormalizeUrl(string url)
@@ -106,17 +181,50 @@ public class PropertyUpsertService : IPropertyUpsertService
         }
     }
 
+    private const string LikeEscape = "\\";
+
+    /// <summary>
+    /// Escapa los comodines de LIKE: las URLs suelen traer '_' y '%' literales.
+    /// </summary>
+    private static string EscapeLike(string value) =>
+        value.Replace("\\", "\\\\").Replace("%", "\\%").Replace("_", "\\_");
+
     // ── Upsert principal ──────────────────────────────────────────────────────
 
+    public async Task PrefetchByFingerprintAsync(IReadOnlyCollection<Property> scraped)
+    {
+        var fingerprints = new List<string>(scraped.Count);
+        foreach (var property in scraped)
+        {
+            // Normalizar + SHA256 una sola vez por propiedad: el upsert lo reutiliza
+            var fp = property.Fingerprint = GenerateFingerprint(property);
+            if (!_prefetchedFingerprints.Contains(fp))
+                fingerprints.Add(fp);
+        }
+        fingerprints = fingerprints.Distinct().ToList();
+
+        if (fingerprints.Count == 0) return;
+
+        // Quedan trackeadas: el Paso 1 del upsert las encuentra en Local
+        await _context.Properties
+            .Where(p => fingerprints.Contains(p.Fingerprint))
+            .LoadAsync();
+
+        _prefetchedFingerprints.UnionWith(fingerprints);
+    }
+
     public async Task<UpsertResult> UpsertPropertyAsync(Property scraped, int botId)
     {
-        var fingerprint = GenerateFingerprint(scraped);
-        scraped.Fingerprint = fingerprint;
+        // Ya calculado por PrefetchByFingerprintAsync cuando el lote pasó por ahí
+        var fingerprint = scraped.Fingerprint ??= GenerateFingerprint(scraped);
         var now = DateTime.UtcNow;
 
         // ── Paso 1: Buscar por fingerprint ────────────────────────────────────
-        var existing = await _context.Properties
-            .FirstOrDefaultAsync(p => p.Fingerprint == fingerprint);
+        // Primero entre las entidades ya trackeadas: incluye las nuevas de este
+        // mismo lote que todavía no están en la base.
+        var existing = _context.Properties.Local.FirstOrDefault(p => p.Fingerprint == fingerprint);
+        if (existing == null && !_prefetchedFingerprints.Contains(fingerprint))
+            existing = await _context.Properties.FirstOrDefaultAsync(p => p.Fingerprint == fingerprint);
 
         // ── Paso 2: Fallback por SourceUrl normalizada ────────────────────────
         if (existing == null && !string.IsNullOrWhiteSpace(scraped.SourceUrl))
@@ -127,13 +235,29 @@ public class PropertyUpsertService : IPropertyUpsertService
                 ? normalizedUrl[..30]
                 : normalizedUrl;
 
-            var candidates = await _context.Properties
-                .Where(p => p.SourceUrl != null && p.SourceUrl.ToLower().Contains(searchPrefix))
-                .ToListAsync();
-
-            existing = candidates.FirstOrDefault(p =>
+            bool SameUrl(Property p) =>
                 !string.IsNullOrWhiteSpace(p.SourceUrl) &&
-                NormalizeUrl(p.SourceUrl) == normalizedUrl);
+                NormalizeUrl(p.SourceUrl) == normalizedUrl;
+
+            // Primero en memoria: con el flush por lotes, las propiedades nuevas
+            // (o con SourceUrl recién enriquecida) de este lote solo están en el
+            // change tracker y la consulta a la base no las vería.
+            existing = _context.Properties.Local.FirstOrDefault(p =>
+                p.SourceUrl != null
+                && p.SourceUrl.Contains(searchPrefix, StringComparison.OrdinalIgnoreCase)
+                && SameUrl(p));
+
+            if (existing == null)
+            {
+                // LIKE en vez de Contains (que Npgsql traduce a strpos): así la
+                // búsqueda usa el índice de trigramas IX_Properties_SourceUrl_Trgm
+                var urlPattern = $"%{EscapeLike(searchPrefix)}%";
+                var candidates = await _context.Properties
+                    .Where(p => p.SourceUrl != null && EF.Functions.Like(p.SourceUrl.ToLower(), urlPattern, LikeEscape))
+                    .ToListAsync();
+
+                existing = candidates.FirstOrDefault(SameUrl);
+            }
 
             if (existing != null && existing.Fingerprint != fingerprint)
             {
@@ -157,28 +281,12 @@ public class PropertyUpsertService : IPropertyUpsertService
 
             if (normTitle.Length > 3)
             {
-                // Buscar candidatos que compartan ciudad y tipo (si los tiene)
-                var candidateQuery = _context.Properties.AsQueryable();
-
-                if (!string.IsNullOrEmpty(normCity))
-                    candidateQuery = candidateQuery.Where(p => p.City != null);
-
-                if (!string.IsNullOrEmpty(normType))
-                    candidateQuery = candidateQuery.Where(p => p.PropertyType != null);
-
-                // Traer un set acotado para comparar en memoria
-                // Usar un prefijo del título para filtrar en SQL
+                // Prefijo del título para acotar candidatos (en SQL y en memoria)
                 var titlePrefix = normTitle.Length > 10 ? scraped.Title!.Substring(0, 10) : scraped.Title!;
-                var candidates = await candidateQuery
-                    .Where(p => p.Title != null && p.Title.ToLower().Contains(titlePrefix.ToLower()))
-                    .Take(50)
-                    .ToListAsync();
 
-                existing = candidates.FirstOrDefault(p =>
+                bool IsFuzzyMatch(Property p)
                 {
                     var pTitle = NormalizeText(p.Title);
-                    var pCity  = NormalizeText(p.City);
-                    var pType  = NormalizeText(p.PropertyType);
 
                     // Título debe ser muy similar (igual normalizado o uno contiene al otro)
                     var titleMatch = pTitle == normTitle
@@ -187,18 +295,57 @@ public class PropertyUpsertService : IPropertyUpsertService
 
                     if (!titleMatch) return false;
 
+                    // Ciudad y tipo se normalizan solo para los candidatos cuyo
+                    // título ya coincide (la mayoría se descarta antes).
                     // Ciudad debe coincidir si ambas existen
-                    if (!string.IsNullOrEmpty(normCity) && !string.IsNullOrEmpty(pCity)
-                        && pCity != normCity)
-                        return false;
+                    if (!string.IsNullOrEmpty(normCity))
+                    {
+                        var pCity = NormalizeText(p.City);
+                        if (!string.IsNullOrEmpty(pCity) && pCity != normCity)
+                            return false;
+                    }
 
                     // Tipo debe coincidir si ambos existen
-                    if (!string.IsNullOrEmpty(normType) && !string.IsNullOrEmpty(pType)
-                        && pType != normType)
-                        return false;
+                    if (!string.IsNullOrEmpty(normType))
+                    {
+                        var pType = NormalizeText(p.PropertyType);
+                        if (!string.IsNullOrEmpty(pType) && pType != normType)
+                            return false;
+                    }
 
                     return true;
-                });
+                }
+
+                // Primero en memoria: las propiedades de este lote aún sin flush
+                // solo están en el change tracker. Mismo filtro que la consulta SQL.
+                existing = _context.Properties.Local.FirstOrDefault(p =>
+                    p.Title != null
+                    && p.Title.Contains(titlePrefix, StringComparison.OrdinalIgnoreCase)
+                    && (string.IsNullOrEmpty(normCity) || p.City != null)
+                    && (string.IsNullOrEmpty(normType) || p.PropertyType != null)
+                    && IsFuzzyMatch(p));
+
+                if (existing == null)
+                {
+                    // Buscar candidatos que compartan ciudad y tipo (si los tiene)
+                    var candidateQuery = _context.Properties.AsQueryable();
+
+                    if (!string.IsNullOrEmpty(normCity))
+                        candidateQuery = candidateQuery.Where(p => p.City != null);
+
+                    if (!string.IsNullOrEmpty(normType))
+                        candidateQuery = candidateQuery.Where(p => p.PropertyType != null);
+
+                    // Traer un set acotado para comparar en memoria
+                    // (LIKE sobre lower(Title): índice IX_Properties_Title_Trgm)
+                    var titlePattern = $"%{EscapeLike(titlePrefix.ToLower())}%";
+                    var candidates = await candidateQuery
+                        .Where(p => p.Title != null && EF.Functions.Like(p.Title.ToLower(), titlePattern, LikeEscape))
+                        .Take(50)
+                        .ToListAsync();
+
+                    existing = candidates.FirstOrDefault(IsFuzzyMatch);
+                }
 
                 if (existing != null)
                 {
@@ -224,31 +371,8 @@ public class PropertyUpsertService : IPropertyUpsertService
             scraped.ListingStatus = "active";
 
             _context.Properties.Add(scraped);
-            await _context.SaveChangesAsync();
+            _context.PropertySnapshots.Add(BuildSnapshot(scraped, botId, now, changedFields: null));
 
-            _context.PropertySnapshots.Add(new PropertySnapshot
-            {
-                PropertyId    = scraped.Id,
-                BotId         = botId,
-                ScrapedAt     = now,
-                Price         = scraped.Price,
-                Currency      = scraped.Currency,
-                Bedrooms      = scraped.Bedrooms,
-                Bathrooms     = scraped.Bathrooms,
-                Area          = scraped.Area,
-                PropertyType  = scraped.PropertyType,
-                Title         = scraped.Title,
-                Region          = scraped.Region,
-                City            = scraped.City,
-                Neighborhood    = scraped.Neighborhood,
-                PublicationDate = scraped.PublicationDate,
-                Condition       = scraped.Condition,
-                IsArriendo      = scraped.IsArriendo,
-                HasChanges      = false,
-                ChangedFields   = null,
-            });
-
-            await _context.SaveChangesAsync();
             return UpsertResult.New;
         }
 
@@ -259,13 +383,16 @@ public class PropertyUpsertService : IPropertyUpsertService
         existing.TimesScraped++;
         existing.ListingStatus = "active";
 
-        var changedFields = new List<string>();
+        // La mayoría de las re-apariciones no cambian nada: la lista solo se
+        // crea cuando aparece el primer campo modificado.
+        List<string>? changedFields = null;
+        void MarkChanged(string field) => (changedFields ??= new List<string>(2)).Add(field);
 
         if (scraped.Price.HasValue    && scraped.Price > 0
             && existing.Price.HasValue && existing.Price > 0
             && scraped.Price != existing.Price)
         {
-            changedFields.Add("Price");
+            MarkChanged("Price");
             existing.PreviousPrice  = existing.Price;
             existing.PriceChangedAt = now;
             existing.Price          = scraped.Price;
@@ -276,7 +403,7 @@ public class PropertyUpsertService : IPropertyUpsertService
             && existing.Bedrooms.HasValue
             && scraped.Bedrooms != existing.Bedrooms)
         {
-            changedFields.Add("Bedrooms");
+            MarkChanged("Bedrooms");
             existing.Bedrooms = scraped.Bedrooms;
         }
 
@@ -284,7 +411,7 @@ public class PropertyUpsertService : IPropertyUpsertService
             && existing.Bathrooms.HasValue
             && scraped.Bathrooms != existing.Bathrooms)
         {
-            changedFields.Add("Bathrooms");
+            MarkChanged("Bathrooms");
             existing.Bathrooms = scraped.Bathrooms;
         }
 
@@ -292,7 +419,7 @@ public class PropertyUpsertService : IPropertyUpsertService
             && existing.Area.HasValue
             && scraped.Area != existing.Area)
         {
-            changedFields.Add("Area");
+            MarkChanged("Area");
             existing.Area = scraped.Area;
         }
 
@@ -300,15 +427,15 @@ public class PropertyUpsertService : IPropertyUpsertService
             && !string.IsNullOrWhiteSpace(existing.Currency)
             && scraped.Currency != existing.Currency)
         {
-            changedFields.Add("Currency");
+            MarkChanged("Currency");
             existing.Currency = scraped.Currency;
         }
 
         if (!string.IsNullOrWhiteSpace(scraped.Title)
             && !string.IsNullOrWhiteSpace(existing.Title)
-            && scraped.Title.Trim() != existing.Title.Trim())
+            && !scraped.Title.AsSpan().Trim().SequenceEqual(existing.Title.AsSpan().Trim()))
         {
-            changedFields.Add("Title");
+            MarkChanged("Title");
             existing.Title = scraped.Title;
         }
 
@@ -316,7 +443,7 @@ public class PropertyUpsertService : IPropertyUpsertService
             && !string.IsNullOrWhiteSpace(existing.PropertyType)
             && scraped.PropertyType != existing.PropertyType)
         {
-            changedFields.Add("PropertyType");
+            MarkChanged("PropertyType");
             existing.PropertyType = scraped.PropertyType;
         }
 
@@ -324,7 +451,7 @@ public class PropertyUpsertService : IPropertyUpsertService
             && !string.IsNullOrWhiteSpace(existing.Condition)
             && scraped.Condition != existing.Condition)
         {
-            changedFields.Add("Condition");
+            MarkChanged("Condition");
             existing.Condition = scraped.Condition;
         }
 
@@ -332,7 +459,7 @@ public class PropertyUpsertService : IPropertyUpsertService
             && existing.IsArriendo.HasValue
             && scraped.IsArriendo != existing.IsArriendo)
         {
-            changedFields.Add("IsArriendo");
+            MarkChanged("IsArriendo");
             existing.IsArriendo = scraped.IsArriendo;
         }
 
@@ -346,32 +473,44 @@ public class PropertyUpsertService : IPropertyUpsertService
         if (!existing.PublicationDate.HasValue && scraped.PublicationDate.HasValue) existing.PublicationDate = scraped.PublicationDate;
         if (!existing.IsArriendo.HasValue && scraped.IsArriendo.HasValue) existing.IsArriendo = scraped.IsArriendo;
 
-        var hasChanges = changedFields.Count > 0;
+        var hasChanges = changedFields is { Count: > 0 };
+
+        _context.PropertySnapshots.Add(BuildSnapshot(existing, botId, now, changedFields));
 
-        _context.PropertySnapshots.Add(new PropertySnapshot
+        return hasChanges ? UpsertResult.Updated : UpsertResult.Unchanged;
+    }
+
+    /// <summary>
+    /// Foto del estado actual de <paramref name="source"/>. Único punto donde se
+    /// copian los campos a PropertySnapshot (propiedad nueva y existente).
+    /// Se enlaza por navegación: si la propiedad es nueva aún no tiene Id, y EF
+    /// completa PropertyId al insertarla en el mismo SaveChanges.
+    /// </summary>
+    private static PropertySnapshot BuildSnapshot(
+        Property source, int botId, DateTime now, List<string>? changedFields)
+    {
+        var hasChanges = changedFields is { Count: > 0 };
+
+        return new PropertySnapshot
         {
-            PropertyId    = existing.Id,
+            Property      = source,
             BotId         = botId,
             ScrapedAt     = now,
-            Price         = existing.Price,
-            Currency      = existing.Currency,
-            Bedrooms      = existing.Bedrooms,
-            Bathrooms     = existing.Bathrooms,
-            Area          = existing.Area,
-            PropertyType  = existing.PropertyType,
-            Title         = existing.Title,
-            Region          = existing.Region,
-            City            = existing.City,
-            Neighborhood    = existing.Neighborhood,
-            PublicationDate = existing.PublicationDate,
-            Condition       = existing.Condition,
-            IsArriendo      = existing.IsArriendo,
+            Price         = source.Price,
+            Currency      = source.Currency,
+            Bedrooms      = source.Bedrooms,
+            Bathrooms     = source.Bathrooms,
+            Area          = source.Area,
+            PropertyType  = source.PropertyType,
+            Title         = source.Title,
+            Region          = source.Region,
+            City            = source.City,
+            Neighborhood    = source.Neighborhood,
+            PublicationDate = source.PublicationDate,
+            Condition       = source.Condition,
+            IsArriendo      = source.IsArriendo,
             HasChanges      = hasChanges,
-            ChangedFields   = hasChanges ? string.Join(",", changedFields) : null,
-        });
-
-        await _context.SaveChangesAsync();
-
-        return hasChanges ? UpsertResult.Updated : UpsertResult.Unchanged;
+            ChangedFields   = hasChanges ? string.Join(",", changedFields!) : null,
+        };
     }
 }
\ No newline at end of file
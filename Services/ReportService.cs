@@ -1,3 +1,4 @@
+using System.Buffers;
 using System.Diagnostics;
 using System.Globalization;
 using System.Text;
@@ -1686,28 +1687,47 @@ public class ReportService : IReportService
             .ToList();
     }
 
+    private static readonly string[] _monthLabels =
+        { "Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic" };
+
     private static string MonthLabel(int year, int month)
     {
-        var months = new[] { "Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic" };
-        return $"{months[month - 1]}/{year % 100:D2}";
+        return $"{_monthLabels[month - 1]}/{year % 100:D2}";
     }
 
     // ── Escape caracteres especiales de LaTeX ─────────────────────────────────
+    private static readonly SearchValues<char> _latexSpecials =
+        SearchValues.Create(@"\&%$#_{}~^…");
+
+    /// <summary>
+    /// Una sola pasada por el texto (se llama por cada celda de las tablas).
+    /// La mayoría de los textos no tiene caracteres especiales y se devuelve
+    /// tal cual, sin copias.
+    /// </summary>
     private static string Esc(string? s)
     {
         if (string.IsNullOrEmpty(s)) return "---";
-        return s
-            .Replace(@"\", @"\textbackslash{}")
-            .Replace("&",  @"\&")
-            .Replace("%",  @"\%")
-            .Replace("$",  @"\$")
-            .Replace("#",  @"\#")
-            .Replace("_",  @"\_")
-            .Replace("{",  @"\{")
-            .Replace("}",  @"\}")
-            .Replace("~",  @"\textasciitilde{}")
-            .Replace("^",  @"\textasciicircum{}")
-            .Replace("…",  @"\ldots{}");
+
+        var first = s.AsSpan().IndexOfAny(_latexSpecials);
+        if (first < 0) return s;
+
+        var sb = new StringBuilder(s.Length + 16).Append(s, 0, first);
+        for (int i = first; i < s.Length; i++)
+        {
+            var c = s[i];
+            switch (c)
+            {
+                case '\\': sb.Append(@"\textbackslash{}");     break;
+                case '~':  sb.Append(@"\textasciitilde{}");    break;
+                case '^':  sb.Append(@"\textasciicircum{}");   break;
+                case '…':  sb.Append(@"\ldots{}");             break;
+                case '&' or '%' or '$' or '#' or '_' or '{' or '}':
+                    sb.Append('\\').Append(c);
+                    break;
+                default:   sb.Append(c);                       break;
+            }
+        }
+        return sb.ToString();
     }
 
     private static string FormatPrice(double? value, string? currency)
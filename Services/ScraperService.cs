@@ -1,12 +1,17 @@
 using System;
+using System.Buffers;
+using System.Collections.Frozen;
 using System.Collections.Generic;
 using System.Linq;
 using System.Net.Http;
+using System.Security.Cryptography;
 using System.Text;
 using System.Text.Json;
+using System.Text.Json.Serialization;
 using System.Text.RegularExpressions;
 using System.Threading.Tasks;
 using Microsoft.EntityFrameworkCore;
+using Microsoft.Extensions.Caching.Memory;
 using Microsoft.Extensions.Logging;
 using Microsoft.Playwright;
 using HtmlAgilityPack;
@@ -22,14 +27,20 @@ public interface IScraperService
     Task<List<Property>> ScrapePropertiesAsync(Bot bot);
 }
 
-public class ScraperService : IScraperService
+public partial class ScraperService : IScraperService
 {
+    /// <summary>
+    /// Cliente HTTP nombrado para descargar páginas de listados (configurado en Program.cs).
+    /// </summary>
+    public const string HttpClientName = "scraper";
+
     private readonly ApplicationDbContext _context;
     private readonly IHttpClientFactory _httpClientFactory;
     private readonly ILogger<ScraperService> _logger;
     private readonly IAmazonBedrockRuntime _bedrockClient;
     private readonly IBotLogService _botLogService;
     private readonly IPropertyUpsertService _upsertService;
+    private readonly IMemoryCache _cache;
 
     public ScraperService(
         ApplicationDbContext context,
@@ -37,7 +48,8 @@ public class ScraperService : IScraperService
         ILogger<ScraperService> logger,
         IAmazonBedrockRuntime bedrockClient,
         IBotLogService botLogService,
-        IPropertyUpsertService upsertService)
+        IPropertyUpsertService upsertService,
+        IMemoryCache cache)
     {
         _context = context;
         _httpClientFactory = httpClientFactory;
@@ -45,21 +57,45 @@ public class ScraperService : IScraperService
         _bedrockClient = bedrockClient;
         _botLogService = botLogService;
         _upsertService = upsertService;
+        _cache = cache;
     }
 
     // ══════════════════════════════════════════════════════════════════════
     // STOP SIGNAL HELPERS
     // ══════════════════════════════════════════════════════════════════════
 
-    private async Task<bool> IsBotStoppingAsync(int botId)
-    {
-        var status = await _context.Bots
+    /// <summary>
+    /// Lee solo la columna Status del bot (sin materializar ni trackear la fila).
+    /// </summary>
+    private Task<string?> GetBotStatusAsync(int botId) =>
+        _context.Bots
             .AsNoTracking()
             .Where(b => b.Id == botId)
             .Select(b => b.Status)
             .FirstOrDefaultAsync();
 
-        return status == "stopping";
+    /// <summary>
+    /// Intervalo mínimo entre lecturas del estado para detectar el stop. El
+    /// chequeo se hace entre fases, entre chunks y cada pocas propiedades; una
+    /// señal de stop puede esperar un par de segundos, un SELECT por chequeo no.
+    /// </summary>
+    private const int StopCheckIntervalMs = 2_000;
+
+    // Estado por ejecución: el servicio es scoped y cada job de Hangfire tiene su scope
+    private long _nextStopCheckAt;
+    private bool _stopRequested;
+
+    private async Task<bool> IsBotStoppingAsync(int botId)
+    {
+        // Una vez visto el stop no hace falta volver a la base
+        if (_stopRequested) return true;
+
+        var now = Environment.TickCount64;
+        if (now < _nextStopCheckAt) return false;
+
+        _stopRequested   = await GetBotStatusAsync(botId) == "stopping";
+        _nextStopCheckAt = now + StopCheckIntervalMs;
+        return _stopRequested;
     }
 
     private async Task HandleStopAsync(Bot bot, int newCount)
@@ -67,16 +103,86 @@ public class ScraperService : IScraperService
         await _botLogService.LogWarningAsync(bot.Id, bot.Name,
             $"🛑 Bot detenido manualmente. Propiedades procesadas en esta sesión: {newCount}");
 
-        bot.Status = "stopped";
-        bot.UpdatedAt = DateTime.UtcNow;
-        bot.LastError = null;
-        await _context.SaveChangesAsync();
+        await SetBotStatusAsync(bot, "stopped", lastError: null);
+    }
+
+    /// <summary>
+    /// Persiste el estado del bot con un UPDATE acotado a las columnas de estado,
+    /// sin recargar la fila ni pasar por el change tracker (que durante el upsert
+    /// tiene cientos de entidades). Refleja los mismos valores en la entidad en
+    /// memoria sin dejarla marcada como modificada.
+    /// </summary>
+    private async Task SetBotStatusAsync(Bot bot, string status, string? lastError)
+    {
+        var now = DateTime.UtcNow;
+
+        await _context.Bots
+            .Where(b => b.Id == bot.Id)
+            .ExecuteUpdateAsync(s => s
+                .SetProperty(b => b.Status,    status)
+                .SetProperty(b => b.LastError, lastError)
+                .SetProperty(b => b.UpdatedAt, now));
+
+        bot.Status    = status;
+        bot.LastError = lastError;
+        bot.UpdatedAt = now;
+
+        // La fila ya está escrita: alinear el snapshot para que el próximo
+        // SaveChanges no vuelva a emitir un UPDATE del bot.
+        var entry = _context.Entry(bot);
+        entry.OriginalValues.SetValues(entry.CurrentValues);
+    }
+
+    /// <summary>
+    /// Pasa el bot a "running" solo si no está ya corriendo o deteniéndose, en un
+    /// único UPDATE condicional: la fila se bloquea durante el UPDATE, así que de
+    /// dos instancias simultáneas (scheduler + manual, o dos workers de Hangfire)
+    /// solo una ve 1 fila afectada. La otra se descarta sin descargar nada.
+    /// </summary>
+    private async Task<bool> TryClaimBotAsync(Bot bot)
+    {
+        var now = DateTime.UtcNow;
+
+        var claimed = await _context.Bots
+            .Where(b => b.Id == bot.Id && b.Status != "running" && b.Status != "stopping")
+            .ExecuteUpdateAsync(s => s
+                .SetProperty(b => b.Status,    "running")
+                .SetProperty(b => b.LastRun,   now)
+                .SetProperty(b => b.UpdatedAt, now));
+
+        if (claimed == 0) return false;
+
+        bot.Status    = "running";
+        bot.LastRun   = now;
+        bot.UpdatedAt = now;
+
+        var entry = _context.Entry(bot);
+        entry.OriginalValues.SetValues(entry.CurrentValues);
+        return true;
     }
 
     // ══════════════════════════════════════════════════════════════════════
     // MAIN SCRAPING METHOD
     // ══════════════════════════════════════════════════════════════════════
 
+    /// <summary>
+    /// Propiedades upserteadas por cada SaveChanges. Acota el change tracker y
+    /// lo que se pierde si la ejecución falla a mitad de camino. Cada flush
+    /// (propiedad + snapshot por item) viaja en un solo batch de Npgsql, así que
+    /// una página típica (30-100 avisos) se guarda en uno o dos round-trips.
+    /// Dedup dentro del lote: hasta el flush las propiedades nuevas solo existen
+    /// en el change tracker, así que todos los pasos del upsert (fingerprint,
+    /// URL y título) buscan primero en Properties.Local y después en la base.
+    /// </summary>
+    private const int UpsertFlushSize = 100;
+
+    /// <summary>
+    /// Tope de HTML que se parsea. Páginas anómalas (dumps de varios MB) se
+    /// cortan antes de construir el DOM: el parser tolera el HTML truncado y
+    /// así no se parsea ni se manda a Bedrock contenido que igual sería ruido.
+    /// </summary>
+    private const int MaxHtmlChars = 5_000_000;
+
     public async Task<List<Property>> ScrapePropertiesAsync(Bot bot)
     {
         var scrapedProperties = new List<Property>();
@@ -87,20 +193,15 @@ public class ScraperService : IScraperService
 
             await _botLogService.LogInfoAsync(bot.Id, bot.Name, "🚀 Bot execution started");
 
-            // Guard contra doble ejecucion (scheduler + manual simultaneos)
-            await _context.Entry(bot).ReloadAsync();
-            if (bot.Status == "running" || bot.Status == "stopping")
+            // Guard contra doble ejecucion (scheduler + manual simultaneos):
+            // el chequeo de estado y el paso a "running" son el mismo UPDATE.
+            if (!await TryClaimBotAsync(bot))
             {
                 await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                    $"⚠️ Bot ya en ejecucion (status={bot.Status}). Cancelando instancia duplicada.");
+                    "⚠️ Bot ya en ejecucion (running/stopping). Cancelando instancia duplicada.");
                 return scrapedProperties;
             }
 
-            bot.Status = "running";
-            bot.LastRun = DateTime.UtcNow;
-            bot.UpdatedAt = DateTime.UtcNow;
-            await _context.SaveChangesAsync();
-
             await _botLogService.LogInfoAsync(bot.Id, bot.Name, "📊 Bot status updated to 'running'");
 
             // ══════════════════════════════════════════════════════════════
@@ -110,6 +211,13 @@ public class ScraperService : IScraperService
             var html = await DownloadHtmlAsync(bot);
             await _botLogService.LogSuccessAsync(bot.Id, bot.Name, $"✅ HTML downloaded: {html.Length:N0} characters");
 
+            if (html.Length > MaxHtmlChars)
+            {
+                await _botLogService.LogWarningAsync(bot.Id, bot.Name,
+                    $"⚠️ HTML excede {MaxHtmlChars:N0} caracteres; se trunca antes de parsear.");
+                html = html[..MaxHtmlChars];
+            }
+
             if (await IsBotStoppingAsync(bot.Id))
             {
                 await HandleStopAsync(bot, 0);
@@ -119,8 +227,13 @@ public class ScraperService : IScraperService
             // ══════════════════════════════════════════════════════════════
             // FASE 2: Extraer datos embebidos en JSON
             // ══════════════════════════════════════════════════════════════
+            // El HTML se parsea una sola vez: los <script> se leen aquí y
+            // la FASE 3 limpia ese mismo árbol.
+            var pageDoc = new HtmlDocument();
+            pageDoc.LoadHtml(html);
+
             await _botLogService.LogInfoAsync(bot.Id, bot.Name, "📦 Extracting embedded JSON data (Next.js, JSON-LD, __PRELOADED_STATE__, etc.)");
-            var embeddedData = ExtractEmbeddedJsonData(html);
+            var embeddedData = ExtractEmbeddedJsonData(pageDoc);
             if (embeddedData.Length > 100)
             {
                 await _botLogService.LogSuccessAsync(bot.Id, bot.Name,
@@ -145,13 +258,12 @@ public class ScraperService : IScraperService
             // para evitar perder datos en SPAs.
             // ══════════════════════════════════════════════════════════════
             await _botLogService.LogInfoAsync(bot.Id, bot.Name, "🧹 Cleaning HTML (removing scripts, styles, SVGs…)");
-            var cleanedHtml = RemoveNoiseTags(html);
-            var reductionPct = html.Length > 0 ? 100 - (cleanedHtml.Length * 100 / html.Length) : 0;
+            var removedNodes = RemoveNoiseTags(pageDoc);
             await _botLogService.LogSuccessAsync(bot.Id, bot.Name,
-                $"✅ Noise removed: {cleanedHtml.Length:N0} chars (reduced {reductionPct}%)");
+                $"✅ Noise removed: {removedNodes:N0} nodes");
 
             await _botLogService.LogInfoAsync(bot.Id, bot.Name, "📝 Converting HTML to compact text");
-            var compactText = ConvertHtmlToText(cleanedHtml, bot.Url);
+            var compactText = ConvertHtmlToText(pageDoc, bot.Url);
             await _botLogService.LogInfoAsync(bot.Id, bot.Name,
                 $"📝 Compact text from HTML: {compactText.Length:N0} chars");
 
@@ -196,9 +308,11 @@ public class ScraperService : IScraperService
                         return scrapedProperties;
                     }
 
-                    var jsEmbedded  = ExtractEmbeddedJsonData(jsHtml);
-                    var jsCleaned   = RemoveNoiseTags(jsHtml);
-                    var jsText      = ConvertHtmlToText(jsCleaned, bot.Url);
+                    var jsDoc       = new HtmlDocument();
+                    jsDoc.LoadHtml(jsHtml);
+                    var jsEmbedded  = ExtractEmbeddedJsonData(jsDoc);
+                    RemoveNoiseTags(jsDoc);
+                    var jsText      = ConvertHtmlToText(jsDoc, bot.Url);
 
                     await _botLogService.LogInfoAsync(bot.Id, bot.Name,
                         $"📦 Playwright results — HTML text: {jsText.Length:N0} chars | Embedded: {jsEmbedded.Length:N0} chars | API data: {capturedApiData.Length:N0} chars");
@@ -237,10 +351,20 @@ public class ScraperService : IScraperService
             {
                 await _botLogService.LogWarningAsync(bot.Id, bot.Name,
                     "⚠️ No se pudo extraer texto legible suficiente. Abortando.");
-                bot.Status = "completed";
+                var abortedAt = DateTime.UtcNow;
+                await _context.Bots
+                    .Where(b => b.Id == bot.Id)
+                    .ExecuteUpdateAsync(s => s
+                        .SetProperty(b => b.Status,       "completed")
+                        .SetProperty(b => b.LastRunCount, 0)
+                        .SetProperty(b => b.UpdatedAt,    abortedAt));
+
+                bot.Status       = "completed";
                 bot.LastRunCount = 0;
-                bot.UpdatedAt = DateTime.UtcNow;
-                await _context.SaveChangesAsync();
+                bot.UpdatedAt    = abortedAt;
+
+                var abortedEntry = _context.Entry(bot);
+                abortedEntry.OriginalValues.SetValues(abortedEntry.CurrentValues);
                 await _botLogService.LogSuccessAsync(bot.Id, bot.Name,
                     "🎉 Bot completed. Scraped: 0 | New: 0 | Total: " + bot.TotalScraped);
                 return scrapedProperties;
@@ -282,60 +406,71 @@ public class ScraperService : IScraperService
             int updatedCount = 0;
             int unchangedCount = 0;
 
-            for (int i = 0; i < scrapedProperties.Count; i++)
+            // Títulos nuevos/actualizados: se juntan en memoria y se emiten en un
+            // solo log por tipo al final, en vez de un mensaje SignalR por propiedad.
+            var newTitles     = new StringBuilder();
+            var updatedTitles = new StringBuilder();
+
+            // Invariantes del loop: dependen solo del bot, no de cada propiedad
+            int total = scrapedProperties.Count;
+            var botUrl = bot.Url.Trim().TrimEnd('/');
+            var inferredCondition = InferConditionFromUrl(bot.Url);
+            var inferredArriendo  = InferIsArriendoFromUrl(bot.Url);
+
+            // La URL de listados no identifica a ninguna propiedad. Se limpia antes
+            // del prefetch porque el fingerprint depende de SourceUrl.
+            foreach (var property in scrapedProperties)
+            {
+                if (!string.IsNullOrWhiteSpace(property.SourceUrl)
+                    && string.Equals(property.SourceUrl.Trim().TrimEnd('/'), botUrl, StringComparison.OrdinalIgnoreCase))
+                {
+                    property.SourceUrl = null;
+                }
+            }
+
+            // Un solo SELECT ... WHERE Fingerprint IN (...) para todo el lote,
+            // en vez de una consulta por propiedad dentro del loop
+            await _upsertService.PrefetchByFingerprintAsync(scrapedProperties);
+
+            for (int i = 0; i < total; i++)
             {
                 if (i % 5 == 0 && await IsBotStoppingAsync(bot.Id))
                 {
                     await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                        $"⚠️ Stop signal at {i}/{scrapedProperties.Count}.");
+                        $"⚠️ Stop signal at {i}/{total}.");
                     break;
                 }
 
                 var property = scrapedProperties[i];
 
                 // Inferir condition desde la URL del bot si Bedrock no lo detectó
-                if (string.IsNullOrWhiteSpace(property.Condition))
-                {
-                    var inferredCondition = InferConditionFromUrl(bot.Url);
-                    if (inferredCondition != null)
-                        property.Condition = inferredCondition;
-                }
+                if (string.IsNullOrWhiteSpace(property.Condition) && inferredCondition != null)
+                    property.Condition = inferredCondition;
 
                 // Inferir isArriendo desde la URL del bot si Bedrock no lo detectó
-                if (!property.IsArriendo.HasValue)
-                {
-                    var inferredArriendo = InferIsArriendoFromUrl(bot.Url);
-                    if (inferredArriendo.HasValue)
-                        property.IsArriendo = inferredArriendo;
-                }
-
-                await _botLogService.SendProgressAsync(bot.Id, bot.Name, i + 1, scrapedProperties.Count,
-                    $"Processing: {property.Title?.Substring(0, Math.Min(40, property.Title?.Length ?? 0))}...");
+                if (!property.IsArriendo.HasValue && inferredArriendo.HasValue)
+                    property.IsArriendo = inferredArriendo;
 
-                if (!string.IsNullOrWhiteSpace(property.SourceUrl))
-                {
-                    var scraped = property.SourceUrl.Trim().TrimEnd('/');
-                    var botUrl  = bot.Url.Trim().TrimEnd('/');
-                    if (string.Equals(scraped, botUrl, StringComparison.OrdinalIgnoreCase))
-                    {
-                        property.SourceUrl = null;
-                    }
-                }
+                var title = property.Title;
+                await _botLogService.SendProgressAsync(bot.Id, bot.Name, i + 1, total,
+                    $"Processing: {(title is { Length: > 40 } ? title[..40] : title)}...");
 
                 var result = await _upsertService.UpsertPropertyAsync(property, bot.Id);
 
+                // El upsert solo deja los cambios en el contexto: se envían por lotes
+                if ((i + 1) % UpsertFlushSize == 0)
+                    await _context.SaveChangesAsync();
+
                 switch (result)
                 {
                     case UpsertResult.New:
                         newCount++;
-                        await _botLogService.LogInfoAsync(bot.Id, bot.Name,
-                            $"➕ Nueva: {property.Title}");
+                        newTitles.Append("\n  • ").Append(property.Title);
                         break;
 
                     case UpsertResult.Updated:
                         updatedCount++;
-                        await _botLogService.LogInfoAsync(bot.Id, bot.Name,
-                            $"📝 Actualizada: {property.Title}");
+                        updatedTitles.Append("\n  • ").Append(property.Title);
                         break;
 
                     case UpsertResult.Unchanged:
@@ -346,6 +481,11 @@ public class ScraperService : IScraperService
 
             await _context.SaveChangesAsync();
 
+            if (newCount > 0)
+                await _botLogService.LogInfoAsync(bot.Id, bot.Name, $"➕ Nuevas ({newCount}):{newTitles}");
+            if (updatedCount > 0)
+                await _botLogService.LogInfoAsync(bot.Id, bot.Name, $"📝 Actualizadas ({updatedCount}):{updatedTitles}");
+
             await _botLogService.LogSuccessAsync(bot.Id, bot.Name,
                 $"💾 Resultado: {newCount} nuevas | {updatedCount} actualizadas | {unchangedCount} sin cambios " +
                 $"({newCount + updatedCount + unchangedCount} snapshots creados)");
@@ -353,15 +493,35 @@ public class ScraperService : IScraperService
             // ══════════════════════════════════════════════════════════════
             // FASE 9: Actualizar estado final del bot
             // ══════════════════════════════════════════════════════════════
-            await _context.Entry(bot).ReloadAsync();
-            var wasStopped = bot.Status == "stopping";
-
-            bot.Status       = wasStopped ? "stopped" : "completed";
+            // Un solo UPDATE: el incremento de TotalScraped y la resolución de
+            // "stopping" ocurren en SQL, sin recargar la fila (read-modify-write)
+            // ni perder una señal de stop que llegue entre la lectura y la escritura.
+            var finishedAt = DateTime.UtcNow;
+            await _context.Bots
+                .Where(b => b.Id == bot.Id)
+                .ExecuteUpdateAsync(s => s
+                    .SetProperty(b => b.Status,       b => b.Status == "stopping" ? "stopped" : "completed")
+                    .SetProperty(b => b.LastRunCount, scrapedProperties.Count)
+                    .SetProperty(b => b.TotalScraped, b => b.TotalScraped + newCount)
+                    .SetProperty(b => b.UpdatedAt,    finishedAt)
+                    .SetProperty(b => b.LastError,    (string?)null));
+
+            var final = await _context.Bots
+                .AsNoTracking()
+                .Where(b => b.Id == bot.Id)
+                .Select(b => new { b.Status, b.TotalScraped })
+                .FirstAsync();
+
+            var wasStopped = final.Status == "stopped";
+
+            bot.Status       = final.Status;
             bot.LastRunCount = scrapedProperties.Count;
-            bot.TotalScraped += newCount;
-            bot.UpdatedAt    = DateTime.UtcNow;
+            bot.TotalScraped = final.TotalScraped;
+            bot.UpdatedAt    = finishedAt;
             bot.LastError    = null;
-            await _context.SaveChangesAsync();
+
+            var botEntry = _context.Entry(bot);
+            botEntry.OriginalValues.SetValues(botEntry.CurrentValues);
 
             var finalMsg = wasStopped
                 ? $"🛑 Detenido. Nuevas: {newCount} | Actualizadas: {updatedCount} | Total acumulado: {bot.TotalScraped}"
@@ -376,10 +536,9 @@ public class ScraperService : IScraperService
             await _botLogService.LogErrorAsync(bot.Id, bot.Name,
                 $"❌ Bot execution failed: {ex.Message}", ex);
 
-            bot.Status    = "error";
-            bot.LastError = ex.Message;
-            bot.UpdatedAt = DateTime.UtcNow;
-            await _context.SaveChangesAsync();
+            // UPDATE directo: no depende de SaveChanges, que puede ser justamente
+            // lo que falló con cambios pendientes de propiedades.
+            await SetBotStatusAsync(bot, "error", ex.Message);
 
             _logger.LogError(ex, "Error in bot {BotId}", bot.Id);
             throw;
@@ -394,40 +553,40 @@ public class ScraperService : IScraperService
 
     // Regex más robusto: greedy capture del JSON completo.
     // Usa balanceo simple: captura desde { hasta el último } de la línea.
-    private static readonly Regex _windowAssignmentRegex = new(
-        @"window\[?['""]?__?\w+['""]?\]?\s*=\s*(\{.+\})\s*;?\s*$|window\[?['""]?__?\w+['""]?\]?\s*=\s*(\[.+\])\s*;?\s*$",
-        RegexOptions.Multiline | RegexOptions.Compiled);
+    [GeneratedRegex(@"window\[?['""]?__?\w+['""]?\]?\s*=\s*(\{.+\})\s*;?\s*$|window\[?['""]?__?\w+['""]?\]?\s*=\s*(\[.+\])\s*;?\s*$", RegexOptions.Multiline)]
+    private static partial Regex WindowAssignmentRegex();
 
     // Captura self.__next_f.push([...]) usado por Next.js App Router
-    private static readonly Regex _nextFPushRegex = new(
-        @"self\.__next_f\.push\(\s*\[.*?""(.+?)""\s*\]\s*\)",
-        RegexOptions.Compiled | RegexOptions.Singleline);
+    [GeneratedRegex(@"self\.__next_f\.push\(\s*\[.*?""(.+?)""\s*\]\s*\)", RegexOptions.Singleline)]
+    private static partial Regex NextFPushRegex();
 
-    private static string ExtractEmbeddedJsonData(string html)
+    private static string ExtractEmbeddedJsonData(HtmlDocument doc)
     {
-        var doc = new HtmlDocument();
-        doc.LoadHtml(html);
-
         var sb = new StringBuilder();
 
-        var scriptNodes = doc.DocumentNode.SelectNodes("//script");
-        if (scriptNodes == null) return string.Empty;
-
-        foreach (var script in scriptNodes)
+        // Recorrido directo del árbol: sin compilar ni evaluar XPath
+        foreach (var script in doc.DocumentNode.Descendants("script"))
         {
-            var scriptType = script.GetAttributeValue("type", "").ToLower();
-            var scriptId   = script.GetAttributeValue("id",   "").ToLower();
-            var content    = script.InnerText.Trim();
+            // Scripts externos (src=...): el navegador ignora su cuerpo, así que
+            // no vale la pena materializar su texto.
+            if (script.Attributes.Contains("src"))
+                continue;
 
-            if (string.IsNullOrEmpty(content) || content.Length < 50)
+            var rawContent = script.InnerText;
+            if (rawContent.AsSpan().Trim().Length < 50)
                 continue;
 
-            // 1. Scripts con tipo de dato explícito (JSON-LD, JSON inline)
+            var scriptType = script.GetAttributeValue("type", "");
+            var scriptId   = script.GetAttributeValue("id",   "");
+            var content    = rawContent.Trim();
+
+            // 1. Scripts con tipo de dato explícito (JSON-LD, JSON inline).
+            // Comparaciones sin distinguir mayúsculas: sin copias en minúscula.
             bool isTypedDataScript =
-                scriptType == "application/ld+json" ||
-                scriptType == "application/json" ||
-                scriptId.Contains("__next_data__") ||
-                scriptId.Contains("__nuxt");
+                scriptType.Equals("application/ld+json", StringComparison.OrdinalIgnoreCase) ||
+                scriptType.Equals("application/json", StringComparison.OrdinalIgnoreCase) ||
+                scriptId.Contains("__next_data__", StringComparison.OrdinalIgnoreCase) ||
+                scriptId.Contains("__nuxt", StringComparison.OrdinalIgnoreCase);
 
             if (isTypedDataScript)
             {
@@ -436,7 +595,7 @@ public class ScraperService : IScraperService
             }
 
             // 2. window.X = { ... } con JSON sustancial (greedy)
-            var windowMatches = _windowAssignmentRegex.Matches(content);
+            var windowMatches = WindowAssignmentRegex().Matches(content);
             foreach (Match match in windowMatches)
             {
                 var jsonCandidate = (match.Groups[1].Success ? match.Groups[1].Value : match.Groups[2].Value).Trim();
@@ -447,7 +606,7 @@ public class ScraperService : IScraperService
             // 3. Next.js App Router: self.__next_f.push([...])
             if (windowMatches.Count == 0)
             {
-                var nextFMatches = _nextFPushRegex.Matches(content);
+                var nextFMatches = NextFPushRegex().Matches(content);
                 foreach (Match match in nextFMatches)
                 {
                     var payload = match.Groups[1].Value
@@ -459,7 +618,7 @@ public class ScraperService : IScraperService
             }
 
             // 4. Fallback: scripts que empiezan directo con JSON
-            if (windowMatches.Count == 0 && (content.StartsWith("{") || content.StartsWith("[")))
+            if (windowMatches.Count == 0 && LooksLikeJson(content))
             {
                 if (content.Length > 200)
                     TryAppendJsonContent(content, sb);
@@ -469,6 +628,17 @@ public class ScraperService : IScraperService
         return sb.ToString();
     }
 
+    /// <summary>
+    /// True si el primer carácter no blanco abre un objeto o arreglo JSON.
+    /// Mira solo el inicio: sin TrimStart (que copia el body completo) ni
+    /// StartsWith(string) con comparación cultural.
+    /// </summary>
+    private static bool LooksLikeJson(string text)
+    {
+        var span = text.AsSpan().TrimStart();
+        return !span.IsEmpty && span[0] is '{' or '[';
+    }
+
     private static void TryAppendJsonContent(string content, StringBuilder sb)
     {
         var jsonContent = content.Replace("<!--", "").Replace("-->", "").Trim().TrimEnd(';');
@@ -488,28 +658,43 @@ public class ScraperService : IScraperService
         catch (JsonException) { /* JSON malformado, ignorar */ }
     }
 
-    private static string ExtractTextFromJsonRecursive(JsonElement element, int maxDepth, int currentDepth = 0)
+    // Claves de metadatos de build/runtime (Next.js, webpack...) sin datos de
+    // propiedades. Se construye una vez: antes se armaba en cada nivel de recursión.
+    // Los sets de lookup de esta clase son FrozenSet: solo lectura y optimizados
+    // para Contains, que se llama por cada clave JSON, nodo o atributo.
+    private static readonly FrozenSet<string> _jsonSkipKeys = new[]
+    {
+        "buildid", "assetprefix", "scriptloader", "gsp", "gssp",
+        "isfallback", "dynamicids", "customserver", "appgip",
+        "__n_ssp", "runtimeconfig", "locale", "locales",
+        "defaultlocale", "domainlocales", "icon", "favicon",
+        "stylesheet", "chunks", "webpack",
+        "namedchunkgroups", "hash", "contenthash", "entry"
+    }.ToFrozenSet(StringComparer.OrdinalIgnoreCase);
+
+    private static string ExtractTextFromJsonRecursive(JsonElement element, int maxDepth)
     {
-        if (currentDepth > maxDepth) return string.Empty;
-
         var sb = new StringBuilder();
+        AppendJsonText(element, sb, maxDepth, currentDepth: 0);
+        return sb.ToString();
+    }
 
-        var skipKeys = new HashSet<string>(StringComparer.OrdinalIgnoreCase)
-        {
-            "buildid", "assetprefix", "scriptloader", "gsp", "gssp",
-            "isfallback", "dynamicids", "customserver", "appgip",
-            "__n_ssp", "runtimeconfig", "locale", "locales",
-            "defaultlocale", "domainlocales", "icon", "favicon",
-            "stylesheet", "chunks", "webpack",
-            "namedchunkgroups", "hash", "contenthash", "entry"
-        };
+    /// <summary>
+    /// Escribe el texto del JSON directo en el StringBuilder compartido: cada
+    /// nivel de anidamiento ya no arma su propio string para que el padre lo
+    /// vuelva a copiar (en JSON profundos eso copiaba el mismo texto N veces).
+    /// </summary>
+    private static void AppendJsonText(JsonElement element, StringBuilder sb, int maxDepth, int currentDepth)
+    {
+        if (currentDepth > maxDepth) return;
 
         switch (element.ValueKind)
         {
             case JsonValueKind.Object:
+                var start = sb.Length;
                 foreach (var prop in element.EnumerateObject())
                 {
-                    if (skipKeys.Contains(prop.Name)) continue;
+                    if (_jsonSkipKeys.Contains(prop.Name)) continue;
 
                     if (prop.Value.ValueKind == JsonValueKind.String)
                     {
@@ -517,21 +702,19 @@ public class ScraperService : IScraperService
                         if (!string.IsNullOrWhiteSpace(strVal) && strVal.Length > 1
                             && strVal.Length < 10000 && !IsAssetUrl(strVal))
                         {
-                            sb.AppendLine($"{prop.Name}: {strVal}");
+                            sb.Append(prop.Name).Append(": ").AppendLine(strVal);
                         }
                     }
                     else if (prop.Value.ValueKind == JsonValueKind.Number)
                     {
-                        sb.AppendLine($"{prop.Name}: {prop.Value}");
+                        sb.Append(prop.Name).Append(": ").AppendLine(prop.Value.GetRawText());
                     }
                     else if (prop.Value.ValueKind is JsonValueKind.Object or JsonValueKind.Array)
                     {
-                        var child = ExtractTextFromJsonRecursive(prop.Value, maxDepth, currentDepth + 1);
-                        if (!string.IsNullOrWhiteSpace(child))
-                            sb.Append(child);
+                        AppendJsonText(prop.Value, sb, maxDepth, currentDepth + 1);
                     }
                 }
-                if (currentDepth >= 2 && currentDepth <= 8 && sb.Length > 50)
+                if (currentDepth >= 2 && currentDepth <= 8 && sb.Length - start > 50)
                     sb.AppendLine("---");
                 break;
 
@@ -540,9 +723,7 @@ public class ScraperService : IScraperService
                 foreach (var item in element.EnumerateArray())
                 {
                     if (itemCount++ > 500) break;
-                    var child = ExtractTextFromJsonRecursive(item, maxDepth, currentDepth + 1);
-                    if (!string.IsNullOrWhiteSpace(child))
-                        sb.Append(child);
+                    AppendJsonText(item, sb, maxDepth, currentDepth + 1);
                 }
                 break;
 
@@ -552,28 +733,26 @@ public class ScraperService : IScraperService
                     sb.AppendLine(val);
                 break;
         }
-
-        return sb.ToString();
     }
 
+    // Extensiones y rutas de assets: se buscan todas en una sola pasada sobre
+    // la URL, sin ToLower ni un Contains por marcador.
+    private static readonly SearchValues<string> _assetUrlMarkers = SearchValues.Create(
+        [
+            ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico",
+            ".woff", ".ttf", ".css", ".js?",
+            "/_next/", "/static/", "/chunks/", "/webpack/",
+        ],
+        StringComparison.OrdinalIgnoreCase);
+
     private static bool IsAssetUrl(string value)
     {
         if (string.IsNullOrEmpty(value) || value.Length < 10) return false;
 
         if (value.StartsWith("data:image", StringComparison.OrdinalIgnoreCase)) return true;
 
-        if (value.StartsWith("http", StringComparison.OrdinalIgnoreCase))
-        {
-            var lower = value.ToLower();
-            return lower.Contains(".jpg") || lower.Contains(".jpeg") || lower.Contains(".png")
-                || lower.Contains(".gif") || lower.Contains(".webp") || lower.Contains(".svg")
-                || lower.Contains(".ico") || lower.Contains(".woff") || lower.Contains(".ttf")
-                || lower.Contains(".css") || lower.Contains(".js?")
-                || lower.Contains("/_next/") || lower.Contains("/static/")
-                || lower.Contains("/chunks/") || lower.Contains("/webpack/");
-        }
-
-        return false;
+        return value.StartsWith("http", StringComparison.OrdinalIgnoreCase)
+            && value.AsSpan().ContainsAny(_assetUrlMarkers);
     }
 
     // ══════════════════════════════════════════════════════════════════════
@@ -583,43 +762,53 @@ public class ScraperService : IScraperService
     // se encargue de encontrar las propiedades en el texto completo.
     // ══════════════════════════════════════════════════════════════════════
 
-    private static readonly HashSet<string> _removeTags = new(StringComparer.OrdinalIgnoreCase)
+    private static readonly FrozenSet<string> _removeTags = new[]
     {
         "script", "style", "svg", "path", "noscript",
         "meta", "link", "iframe", "canvas",
         "video", "audio", "source", "track", "map", "area", "template",
         "head"
-    };
+    }.ToFrozenSet(StringComparer.OrdinalIgnoreCase);
 
-    private static readonly HashSet<string> _blockElements = new(StringComparer.OrdinalIgnoreCase)
+    private static readonly FrozenSet<string> _blockElements = new[]
     {
         "div", "p", "h1", "h2", "h3", "h4", "h5", "h6",
         "li", "ul", "ol", "article", "section", "main",
         "tr", "td", "th", "blockquote", "pre", "br", "hr",
         "header", "footer", "nav", "figure", "figcaption"
-    };
+    }.ToFrozenSet(StringComparer.OrdinalIgnoreCase);
 
     /// <summary>
-    /// Paso 1: Elimina tags de ruido (scripts, styles, SVGs, head, etc.)
+    /// Paso 1: Elimina tags de ruido (scripts, styles, SVGs, head, etc.) del
+    /// documento en el lugar; el mismo árbol pasa luego a ConvertHtmlToText sin
+    /// re-serializar ni re-parsear. Devuelve cuántos nodos se quitaron.
     /// NO elimina nav/header/footer porque en SPAs pueden contener listings.
     /// </summary>
-    private static string RemoveNoiseTags(string html)
+    private static int RemoveNoiseTags(HtmlDocument doc)
     {
-        var doc = new HtmlDocument();
-        doc.LoadHtml(html);
+        var noise = new List<HtmlNode>();
+        CollectNoiseNodes(doc.DocumentNode, noise);
+        foreach (var node in noise)
+            node.Remove();
 
-        doc.DocumentNode.Descendants()
-            .Where(n => _removeTags.Contains(n.Name))
-            .ToList()
-            .ForEach(n => n.Remove());
-
-        // Eliminar comentarios HTML
-        doc.DocumentNode.Descendants()
-            .Where(n => n.NodeType == HtmlNodeType.Comment)
-            .ToList()
-            .ForEach(n => n.Remove());
+        return noise.Count;
+    }
 
-        return doc.DocumentNode.OuterHtml;
+    /// <summary>
+    /// Recorre el árbol una sola vez juntando los tags de ruido y los comentarios
+    /// HTML. Un nodo marcado no se explora: su subárbol completo (paths de un svg,
+    /// todo el head, etc.) se va con él, así que visitarlo sería trabajo perdido.
+    /// </summary>
+    private static void CollectNoiseNodes(HtmlNode node, List<HtmlNode> noise)
+    {
+        foreach (var child in node.ChildNodes)
+        {
+            if (child.NodeType == HtmlNodeType.Comment
+                || (child.NodeType == HtmlNodeType.Element && _removeTags.Contains(child.Name)))
+                noise.Add(child);
+            else if (child.HasChildNodes)
+                CollectNoiseNodes(child, noise);
+        }
     }
 
     /// <summary>
@@ -628,11 +817,8 @@ public class ScraperService : IScraperService
     /// Preserva también atributos aria-label, title, alt que pueden
     /// contener texto de propiedades en SPAs.
     /// </summary>
-    private static string ConvertHtmlToText(string html, string? baseUrl = null)
+    private static string ConvertHtmlToText(HtmlDocument doc, string? baseUrl = null)
     {
-        var doc = new HtmlDocument();
-        doc.LoadHtml(html);
-
         Uri? baseUri = null;
         if (!string.IsNullOrWhiteSpace(baseUrl))
             Uri.TryCreate(baseUrl, UriKind.Absolute, out baseUri);
@@ -640,76 +826,169 @@ public class ScraperService : IScraperService
         var sb = new StringBuilder();
         WalkNode(doc.DocumentNode, sb, baseUri);
 
-        // Limpiar whitespace redundante
-        var text = Regex.Replace(sb.ToString(), @"[ \t]+", " ");
-        text = Regex.Replace(text, @"\n{3,}", "\n\n");
+        return CompactWhitespace(sb);
+    }
 
-        var lines = text.Split('\n')
-            .Select(l => l.Trim())
-            .Where(l => l.Length > 1);
+    /// <summary>
+    /// Limpia el whitespace del texto extraído en una sola pasada, sin copias
+    /// intermedias: colapsa espacios/tabs, recorta cada línea y descarta las
+    /// líneas vacías o de un solo carácter.
+    /// </summary>
+    private static string CompactWhitespace(StringBuilder raw)
+    {
+        var result = new StringBuilder(raw.Length);
+        int lineStart = 0;
+        bool pendingSpace = false;
 
-        return string.Join("\n", lines).Trim();
+        foreach (var chunk in raw.GetChunks())
+        {
+            foreach (var c in chunk.Span)
+            {
+                if (c == '\n')
+                {
+                    EndLine(result, ref lineStart);
+                    pendingSpace = false;
+                }
+                else if (c is ' ' or '\t')
+                {
+                    pendingSpace = true;
+                }
+                else if (result.Length == lineStart && char.IsWhiteSpace(c))
+                {
+                    // whitespace al inicio de la línea (\r, nbsp...): se recorta
+                }
+                else
+                {
+                    if (pendingSpace && result.Length > lineStart)
+                        result.Append(' ');
+                    pendingSpace = false;
+                    result.Append(c);
+                }
+            }
+        }
+
+        EndLine(result, ref lineStart);
+
+        // Quitar el separador de la última línea conservada
+        if (result.Length > 0)
+            result.Length--;
+
+        return result.ToString();
+
+        static void EndLine(StringBuilder result, ref int lineStart)
+        {
+            while (result.Length > lineStart && char.IsWhiteSpace(result[^1]))
+                result.Length--;
+
+            if (result.Length - lineStart > 1)
+            {
+                result.Append('\n');
+                lineStart = result.Length;
+            }
+            else
+            {
+                result.Length = lineStart;
+            }
+        }
     }
 
+    // Atributos cuyo texto se vuelca al contenido (SPAs que renderizan desde atributos).
+    // Se emiten siempre en este orden y antes de los data-*, como hasta ahora.
+    private static readonly string[] _meaningfulAttributes =
+    {
+        "aria-label", "title", "alt", "placeholder", "content"
+    };
+
+    private static readonly FrozenDictionary<string, int> _meaningfulAttributeIndex = _meaningfulAttributes
+        .Select((name, i) => KeyValuePair.Create(name, i))
+        .ToFrozenDictionary(StringComparer.OrdinalIgnoreCase);
+
     private static void WalkNode(HtmlNode node, StringBuilder sb, Uri? baseUri = null)
     {
         if (node.NodeType == HtmlNodeType.Text)
         {
-            var text = HtmlEntity.DeEntitize(node.InnerText);
-            if (!string.IsNullOrWhiteSpace(text))
-                sb.Append(text.Trim()).Append(' ');
+            // DeEntitize siempre copia el texto: solo vale la pena si hay entidades.
+            // El recorte se hace sobre el span, sin otra copia del string.
+            var text = node.InnerText;
+            if (text.Contains('&'))
+                text = HtmlEntity.DeEntitize(text);
+
+            var trimmed = text.AsSpan().Trim();
+            if (!trimmed.IsEmpty)
+                sb.Append(trimmed).Append(' ');
             return;
         }
 
         if (node.NodeType != HtmlNodeType.Element) return;
 
-        var tag = node.Name.ToLower();
+        // HtmlAgilityPack ya normaliza los nombres de elementos a minúsculas
+        var tag = node.Name;
         if (tag is "script" or "style" or "svg" or "noscript" or "head") return;
 
         bool isBlock = _blockElements.Contains(tag);
         if (isBlock) sb.AppendLine();
 
-        // Extraer texto de atributos que SPAs usan para renderizar contenido
-        var meaningfulAttrs = new[] { "aria-label", "title", "alt", "placeholder", "content" };
-        foreach (var attrName in meaningfulAttrs)
+        // Una sola pasada por los atributos (en vez de un GetAttributeValue por
+        // nombre en cada elemento, que recorre la lista completa cada vez) para
+        // ver qué hay; la salida mantiene el orden de siempre:
+        //   1. aria-label, title, alt...: texto que las SPAs renderizan desde atributos
+        //   2. data-*: datos estructurados, en orden de documento
+        //   3. href del <a>: se emite después, ver abajo
+        // Solo los elementos que sí tienen alguno de estos pagan la segunda lectura.
+        string? href = null;
+        int meaningfulMask = 0;
+        bool hasData = false;
+        foreach (var attr in node.Attributes)
         {
-            var attrVal = node.GetAttributeValue(attrName, "").Trim();
-            if (!string.IsNullOrEmpty(attrVal) && attrVal.Length > 2 && attrVal.Length < 500)
-            {
-                sb.Append($" {attrVal} ");
-            }
+            var name = attr.Name;
+
+            if (name.StartsWith("data-", StringComparison.OrdinalIgnoreCase))
+                hasData = true;
+            else if (_meaningfulAttributeIndex.TryGetValue(name, out var index))
+                meaningfulMask |= 1 << index;
+            else if (href == null && tag == "a" && name.Equals("href", StringComparison.OrdinalIgnoreCase))
+                href = attr.Value.Trim();
         }
 
-        // Extraer data-* attributes (contienen datos estructurados)
-        foreach (var attr in node.Attributes)
+        for (int i = 0; meaningfulMask != 0; i++, meaningfulMask >>= 1)
         {
-            if (attr.Name.StartsWith("data-", StringComparison.OrdinalIgnoreCase)
-                && !string.IsNullOrWhiteSpace(attr.Value)
-                && attr.Value.Length > 1
-                && attr.Value.Length < 500
-                && !attr.Name.Contains("testid", StringComparison.OrdinalIgnoreCase)
-                && !attr.Name.Contains("tracking", StringComparison.OrdinalIgnoreCase)
-                && !attr.Name.Contains("analytics", StringComparison.OrdinalIgnoreCase))
+            if ((meaningfulMask & 1) == 0) continue;
+
+            var value = node.GetAttributeValue(_meaningfulAttributes[i], "").Trim();
+            if (value.Length > 2 && value.Length < 500)
+                sb.Append(' ').Append(value).Append(' ');
+        }
+
+        if (hasData)
+        {
+            foreach (var attr in node.Attributes)
             {
-                sb.Append($" [{attr.Name}={attr.Value}] ");
+                var name = attr.Name;
+                var value = attr.Value;
+                if (name.StartsWith("data-", StringComparison.OrdinalIgnoreCase)
+                    && !string.IsNullOrWhiteSpace(value)
+                    && value.Length > 1
+                    && value.Length < 500
+                    && !name.Contains("testid", StringComparison.OrdinalIgnoreCase)
+                    && !name.Contains("tracking", StringComparison.OrdinalIgnoreCase)
+                    && !name.Contains("analytics", StringComparison.OrdinalIgnoreCase))
+                {
+                    sb.Append(" [").Append(name).Append('=').Append(value).Append("] ");
+                }
             }
         }
 
         // Preservar href de links — resolver relativos a absolutos
         // IMPORTANTE: Emitir [link:URL] ANTES del contenido hijo para que
         // en el chunking el URL quede asociado al inicio del card de propiedad.
-        if (tag == "a")
+        if (!string.IsNullOrEmpty(href) && !href.StartsWith("javascript:", StringComparison.OrdinalIgnoreCase) && href != "#")
         {
-            var href = node.GetAttributeValue("href", "").Trim();
-            if (!string.IsNullOrEmpty(href) && !href.StartsWith("javascript:") && href != "#")
+            if (baseUri != null && !href.StartsWith("http", StringComparison.OrdinalIgnoreCase))
             {
-                if (baseUri != null && !href.StartsWith("http", StringComparison.OrdinalIgnoreCase))
-                {
-                    if (Uri.TryCreate(baseUri, href, out var absoluteUri))
-                        href = absoluteUri.ToString();
-                }
-                sb.Append($" [link:{href}] ");
+                if (Uri.TryCreate(baseUri, href, out var absoluteUri))
+                    href = absoluteUri.ToString();
             }
+            sb.Append(" [link:").Append(href).Append("] ");
         }
 
         foreach (var child in node.ChildNodes)
@@ -724,11 +1003,7 @@ public class ScraperService : IScraperService
 
     private async Task<string> DownloadHtmlAsync(Bot bot)
     {
-        var client = _httpClientFactory.CreateClient();
-        client.DefaultRequestHeaders.UserAgent.ParseAdd(
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36");
-        client.DefaultRequestHeaders.AcceptLanguage.ParseAdd("es-CL,es;q=0.9");
-
+        var client = _httpClientFactory.CreateClient(HttpClientName);
         var html = await client.GetStringAsync(bot.Url);
         if (!IsJavascriptChallenge(html))
             return html;
@@ -751,21 +1026,34 @@ public class ScraperService : IScraperService
         return html;
     }
 
+    // Marcadores de páginas de challenge anti-bot. SearchValues busca todos en
+    // una sola pasada sobre el HTML en vez de un Contains completo por marcador.
+    private static readonly SearchValues<string> _jsChallengeMarkers = SearchValues.Create(
+        ["requires JavaScript", "_bmstate", "verifyChallenge", "window.location.reload()"],
+        StringComparison.OrdinalIgnoreCase);
+
     private static bool IsJavascriptChallenge(string html)
     {
         if (string.IsNullOrWhiteSpace(html)) return false;
 
-        return html.Contains("requires JavaScript", StringComparison.OrdinalIgnoreCase)
-            || html.Contains("_bmstate",            StringComparison.OrdinalIgnoreCase)
-            || html.Contains("verifyChallenge",     StringComparison.OrdinalIgnoreCase)
-            || html.Contains("window.location.reload()", StringComparison.OrdinalIgnoreCase);
+        return html.AsSpan().ContainsAny(_jsChallengeMarkers);
     }
 
     // ══════════════════════════════════════════════════════════════════════
     // PLAYWRIGHT
     // ══════════════════════════════════════════════════════════════════════
 
-    private static async Task<(string html, string capturedApiData)> DownloadHtmlWithPlaywrightAsync(string url)
+    // Filtros de respuestas capturadas: cada conjunto se busca en una sola
+    // pasada sobre la URL (el handler corre para cada request de la página).
+    private static readonly SearchValues<string> _playwrightAssetMarkers = SearchValues.Create(
+        [".js", ".css", ".woff", ".png", ".jpg", ".svg", ".gif", ".ico"],
+        StringComparison.OrdinalIgnoreCase);
+
+    private static readonly SearchValues<string> _playwrightTrackerMarkers = SearchValues.Create(
+        ["analytics", "tracking", "google", "facebook", "hotjar", "sentry", "newrelic", "datadog"],
+        StringComparison.OrdinalIgnoreCase);
+
+    private async Task<(string html, string capturedApiData)> DownloadHtmlWithPlaywrightAsync(string url)
     {
         using var playwright = await Playwright.CreateAsync();
         await using var browser = await playwright.Chromium.LaunchAsync(new BrowserTypeLaunchOptions
@@ -791,6 +1079,10 @@ public class ScraperService : IScraperService
         var capturedJsonResponses = new List<string>();
         var page = await context.NewPageAsync();
 
+        // El handler corre por cada respuesta de la página (cientos con assets):
+        // los recortes de URL/content-type solo se arman si el nivel Debug está activo.
+        var debugEnabled = _logger.IsEnabled(LogLevel.Debug);
+
         // Capturar TODAS las respuestas de API (JSON, texto con datos, etc.)
         page.Response += async (_, response) =>
         {
@@ -800,31 +1092,17 @@ public class ScraperService : IScraperService
                 var contentType = response.Headers.GetValueOrDefault("content-type", "");
                 var status      = response.Status;
 
-                // DEBUG TEMPORAL: loguear TODAS las respuestas para identificar la API de listings
-                var ctShort = contentType.Length > 30 ? contentType[..30] : contentType;
-                var urlShort = responseUrl.Length > 150 ? responseUrl[..150] : responseUrl;
-                Console.WriteLine($"[PW-DEBUG] {status} | {ctShort} | {urlShort}");
+                // Loguear TODAS las respuestas (Debug) para identificar la API de listings
+                var urlShort = debugEnabled && responseUrl.Length > 150 ? responseUrl[..150] : responseUrl;
+                if (debugEnabled)
+                {
+                    var ctShort = contentType.Length > 30 ? contentType[..30] : contentType;
+                    _logger.LogDebug("[PW-DEBUG] {Status} | {ContentType} | {Url}", status, ctShort, urlShort);
+                }
 
                 // Filtrar assets estáticos
-                bool isStaticAsset =
-                       responseUrl.Contains(".js", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains(".css", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains(".woff", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains(".png", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains(".jpg", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains(".svg", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains(".gif", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains(".ico", StringComparison.OrdinalIgnoreCase);
-
-                bool isTracker =
-                       responseUrl.Contains("analytics", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains("tracking", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains("google", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains("facebook", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains("hotjar", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains("sentry", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains("newrelic", StringComparison.OrdinalIgnoreCase)
-                    || responseUrl.Contains("datadog", StringComparison.OrdinalIgnoreCase);
+                bool isStaticAsset = responseUrl.AsSpan().ContainsAny(_playwrightAssetMarkers);
+                bool isTracker     = responseUrl.AsSpan().ContainsAny(_playwrightTrackerMarkers);
 
                 bool isDataResponse = contentType.Contains("json")
                     || contentType.Contains("text/plain")
@@ -833,22 +1111,25 @@ public class ScraperService : IScraperService
                 if (!isStaticAsset && !isTracker && isDataResponse && status >= 200 && status < 300)
                 {
                     var body = await response.TextAsync();
-                    Console.WriteLine($"[PW-CAPTURE] Candidate: {urlShort} | bodyLen={body.Length} | startsJSON={body.TrimStart().StartsWith("{") || body.TrimStart().StartsWith("[")}");
+                    var startsJson = LooksLikeJson(body);
+                    _logger.LogDebug("[PW-CAPTURE] Candidate: {Url} | bodyLen={BodyLength} | startsJSON={StartsJson}",
+                        urlShort, body.Length, startsJson);
                     // Umbral bajo: capturar cualquier respuesta con datos
-                    if (body.Length > 100 && (body.TrimStart().StartsWith("{") || body.TrimStart().StartsWith("[")))
+                    if (body.Length > 100 && startsJson)
                     {
                         capturedJsonResponses.Add(body);
-                        Console.WriteLine($"[PW-CAPTURED] ✅ {urlShort} | {body.Length} chars");
+                        _logger.LogDebug("[PW-CAPTURED] ✅ {Url} | {BodyLength} chars", urlShort, body.Length);
                     }
                 }
                 else if (!isStaticAsset && status >= 200 && status < 300)
                 {
-                    Console.WriteLine($"[PW-SKIPPED] reason={( isTracker ? "tracker" : "not-data-content-type" )} | {urlShort}");
+                    _logger.LogDebug("[PW-SKIPPED] reason={Reason} | {Url}",
+                        isTracker ? "tracker" : "not-data-content-type", urlShort);
                 }
             }
             catch (Exception ex)
             {
-                System.Diagnostics.Debug.WriteLine($"Response capture skipped ({response.Url}): {ex.Message}");
+                _logger.LogDebug(ex, "Response capture skipped ({Url})", response.Url);
             }
         };
 
@@ -1024,18 +1305,18 @@ public class ScraperService : IScraperService
                     return text.split('\n').map(l => l.trim()).filter(l => l.length > 1).join('\n').trim();
                 })()
             ") ?? "";
-            Console.WriteLine($"[PW-DOM] innerText length: {domInnerText.Length}");
+            _logger.LogDebug("[PW-DOM] innerText length: {Length}", domInnerText.Length);
 
             // Log de preview para debug
-            if (domInnerText.Length > 0)
+            if (debugEnabled && domInnerText.Length > 0)
             {
                 var preview = domInnerText.Length > 500 ? domInnerText[..500] : domInnerText;
-                Console.WriteLine($"[PW-DOM] Preview: {preview}");
+                _logger.LogDebug("[PW-DOM] Preview: {Preview}", preview);
             }
         }
         catch (Exception ex)
         {
-            Console.WriteLine($"[PW-DOM] Error reading innerText: {ex.Message}");
+            _logger.LogWarning("[PW-DOM] Error reading innerText: {Error}", ex.Message);
         }
 
         var renderedHtml = await page.ContentAsync();
@@ -1045,7 +1326,7 @@ public class ScraperService : IScraperService
         try
         {
             var capturedCount = await page.EvaluateAsync<int>("window.__capturedResponses?.length ?? 0");
-            Console.WriteLine($"[PW-JS-INTERCEPTOR] Captured {capturedCount} responses via JS hooks");
+            _logger.LogDebug("[PW-JS-INTERCEPTOR] Captured {Count} responses via JS hooks", capturedCount);
 
             for (int i = 0; i < capturedCount; i++)
             {
@@ -1056,7 +1337,9 @@ public class ScraperService : IScraperService
                     var entryBody = entry.GetProperty("body").GetString() ?? "";
                     var entryCt   = entry.GetProperty("ct").GetString() ?? "";
 
-                    Console.WriteLine($"[PW-JS-CAPTURED] {entryUrl} | ct={entryCt.Substring(0, Math.Min(30, entryCt.Length))} | bodyLen={entryBody.Length}");
+                    if (debugEnabled)
+                        _logger.LogDebug("[PW-JS-CAPTURED] {Url} | ct={ContentType} | bodyLen={BodyLength}",
+                            entryUrl, entryCt[..Math.Min(30, entryCt.Length)], entryBody.Length);
 
                     if (entryBody.Length > 100)
                     {
@@ -1065,13 +1348,13 @@ public class ScraperService : IScraperService
                 }
                 catch (Exception ex)
                 {
-                    Console.WriteLine($"[PW-JS-ERROR] Reading entry {i}: {ex.Message}");
+                    _logger.LogWarning("[PW-JS-ERROR] Reading entry {Index}: {Error}", i, ex.Message);
                 }
             }
         }
         catch (Exception ex)
         {
-            Console.WriteLine($"[PW-JS-ERROR] Reading __capturedResponses: {ex.Message}");
+            _logger.LogWarning("[PW-JS-ERROR] Reading __capturedResponses: {Error}", ex.Message);
         }
 
         // Combinar datos: Playwright response handler + JS interceptor
@@ -1085,7 +1368,7 @@ public class ScraperService : IScraperService
             {
                 // Intentar parsear como JSON
                 var trimmed = json.Trim();
-                if (trimmed.StartsWith("{") || trimmed.StartsWith("["))
+                if (LooksLikeJson(trimmed))
                 {
                     using var jsonDoc = JsonDocument.Parse(trimmed);
                     var text = ExtractTextFromJsonRecursive(jsonDoc.RootElement, maxDepth: 15);
@@ -1160,150 +1443,16 @@ public class ScraperService : IScraperService
         }
     }
 
-    private async Task<List<Property>> ExtractPropertiesWithBedrock(string compactText, Bot bot)
-    {
-        if (IsMockScrapingEnabled())
-        {
-            await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                "Mock scraping enabled; returning synthetic properties without Bedrock.");
-            return BuildMockProperties(bot);
-        }
-
-        var modelId = Environment.GetEnvironmentVariable("BEDROCK_MODEL_ID")
-            ?? "us.anthropic.claude-3-5-sonnet-20241022-v2:0";
-
-        var chunks = ChunkText(compactText, maxChunkSize: 10_000).ToList();
-        await _botLogService.LogInfoAsync(bot.Id, bot.Name,
-            $"📦 Content split into {chunks.Count} chunk(s) (model: {modelId})");
-
-        var allProperties = new List<Property>();
-        var seenKeys = new HashSet<string>(StringComparer.OrdinalIgnoreCase);
-
-        for (int i = 0; i < chunks.Count; i++)
-        {
-            if (await IsBotStoppingAsync(bot.Id))
-            {
-                await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                    $"⚠️ Stop signal between chunks ({i}/{chunks.Count}).");
-                break;
-            }
-
-            var preview = chunks[i].Length > 200 ? chunks[i][..200] + "…" : chunks[i];
-
-            // Contar URLs presentes en el chunk para diagnóstico
-            var linkCount = Regex.Matches(chunks[i], @"\[link:https?://[^\]]+\]").Count;
-            var urlFieldCount = Regex.Matches(chunks[i], @"(?:url|permalink|href|link|canonical):\s*https?://", RegexOptions.IgnoreCase).Count;
-            await _botLogService.LogInfoAsync(bot.Id, bot.Name,
-                $"🤖 Processing chunk {i + 1}/{chunks.Count} ({chunks[i].Length:N0} chars, {linkCount} [link:] tags, {urlFieldCount} url fields)...\nPreview: {preview}");
-
-            var chunkProperties = await ProcessChunkWithBedrock(chunks[i], bot, modelId);
-
-            // ── Fallback: asignar sourceUrl por proximidad en el texto ──
-            // Si Bedrock no extrajo el URL, buscamos el [link:URL] más cercano
-            // al título de la propiedad en el chunk original.
-            var propertiesWithoutUrl = chunkProperties.Where(p => string.IsNullOrWhiteSpace(p.SourceUrl)).ToList();
-            if (propertiesWithoutUrl.Count > 0 && (linkCount > 0 || urlFieldCount > 0))
-            {
-                // Recopilar URLs de [link:URL] y de campos "url/permalink/href: URL" en datos embebidos
-                var linkMatches = Regex.Matches(chunks[i], @"\[link:(https?://[^\]]+)\]");
-                var fieldMatches = Regex.Matches(chunks[i], @"(?:url|permalink|href|canonicalUrl|link):\s*(https?://\S+)", RegexOptions.IgnoreCase);
-
-                var allLinks = linkMatches
-                    .Select(m => new { Url = m.Groups[1].Value.Trim(), Position = m.Index })
-                    .Concat(fieldMatches.Select(m => new { Url = m.Groups[1].Value.Trim(), Position = m.Index }))
-                    .GroupBy(l => l.Url, StringComparer.OrdinalIgnoreCase)
-                    .Select(g => g.First())
-                    .ToList();
-
-                // No usar links que ya fueron asignados por Bedrock
-                var usedUrls = new HashSet<string>(
-                    chunkProperties.Where(p => !string.IsNullOrWhiteSpace(p.SourceUrl))
-                                   .Select(p => p.SourceUrl!),
-                    StringComparer.OrdinalIgnoreCase);
-
-                // Filtrar: no usar la URL del bot (es la página de listados)
-                var botUrlNorm = bot.Url.Trim().TrimEnd('/').ToLowerInvariant();
-                var availableLinks = allLinks
-                    .Where(l => !usedUrls.Contains(l.Url)
-                             && !l.Url.Trim().TrimEnd('/').Equals(botUrlNorm, StringComparison.OrdinalIgnoreCase))
-                    .ToList();
-
-                foreach (var prop in propertiesWithoutUrl)
-                {
-                    if (availableLinks.Count == 0) break;
-                    if (string.IsNullOrWhiteSpace(prop.Title)) continue;
-
-                    // Buscar la posición del título en el chunk
-                    var titleIdx = chunks[i].IndexOf(prop.Title, StringComparison.OrdinalIgnoreCase);
-                    if (titleIdx < 0 && prop.Title.Length > 15)
-                    {
-                        // Intentar con un fragmento del título (primeras palabras)
-                        var titleFragment = prop.Title.Length > 30 ? prop.Title[..30] : prop.Title;
-                        titleIdx = chunks[i].IndexOf(titleFragment, StringComparison.OrdinalIgnoreCase);
-                    }
-
-                    if (titleIdx >= 0)
-                    {
-                        // Asignar el link más cercano al título
-                        var nearest = availableLinks
-                            .OrderBy(l => Math.Abs(l.Position - titleIdx))
-                            .First();
-
-                        prop.SourceUrl = nearest.Url;
-                        availableLinks.Remove(nearest);
-                    }
-                }
-            }
-
-            // Diagnóstico: loguear sourceUrl de cada propiedad extraída
-            var chunkWithUrl = chunkProperties.Count(p => !string.IsNullOrWhiteSpace(p.SourceUrl));
-            if (chunkProperties.Count > 0 && chunkWithUrl == 0)
-            {
-                await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                    $"⚠️ Chunk {i + 1}: {chunkProperties.Count} propiedades extraídas pero NINGUNA tiene sourceUrl (links en texto: {linkCount})");
-            }
-            else if (chunkProperties.Count > 0)
-            {
-                await _botLogService.LogDebugAsync(bot.Id, bot.Name,
-                    $"🔗 Chunk {i + 1}: {chunkWithUrl}/{chunkProperties.Count} con sourceUrl. Ejemplo: {chunkProperties.FirstOrDefault(p => p.SourceUrl != null)?.SourceUrl ?? "n/a"}");
-            }
-
-            int added = 0;
-        foreach (var prop in chunkProperties)
-        {
-         // Dedup key más robusto: normaliza título (lowercase, sin acentos,
-        // sin puntuación, colapsar espacios) para que variaciones menores
-        // del LLM entre chunks no generen duplicados.         
-        // Ej: "Edificio en Las Condes" vs "Edificio Las Condes" → misma key.
-            var normTitle = NormalizeForDedup(prop.Title);
-            var normUrl   = (prop.SourceUrl ?? "").Trim().ToLowerInvariant();
-            var normCity  = NormalizeForDedup(prop.City);
-            var normType  = NormalizeForDedup(prop.PropertyType);
-
-         // Key primaria: por URL (si existe)
-         // Key secundaria: por título + ciudad + tipo (sin URL)
-            var key = !string.IsNullOrEmpty(normUrl)
-             ? $"url:{normUrl}"
-             : $"text:{normTitle}|{normCity}|{normType}";
-
-            if (seenKeys.Add(key))
-            {
-             allProperties.Add(prop);
-             added++;
-             }
-        }
-
-            await _botLogService.LogSuccessAsync(bot.Id, bot.Name,
-                $"✅ Chunk {i + 1}: {chunkProperties.Count} found, {added} unique added");
-        }
+    // ══════════════════════════════════════════════════════════════════════
+    // PROMPT DE EXTRACCIÓN
+    // Constante: solo la URL del bot y el texto del chunk varían por llamada.
+    // ══════════════════════════════════════════════════════════════════════
 
-        return allProperties;
-    }
+    private const string PromptIntro =
+        "Analiza el siguiente texto extraído de una página web de bienes raíces chilena.\n" +
+        "La URL de origen de la página es: ";
 
-    private async Task<List<Property>> ProcessChunkWithBedrock(string chunkText, Bot bot, string modelId)
-    {
-        var prompt = $@"Analiza el siguiente texto extraído de una página web de bienes raíces chilena.
-La URL de origen de la página es: {bot.Url}
+    private const string PromptInstructions = @"
 
 El texto puede contener:
 - URLs entre corchetes como [link:https://...]
@@ -1352,9 +1501,9 @@ Reglas:
 - Si no encuentras ninguna propiedad, responde con un array vacío
 
 Responde ÚNICAMENTE con JSON válido, sin texto adicional:
-{{
+{
   ""properties"": [
-    {{
+    {
       ""title"": ""Departamento 3D en Providencia"",
       ""sourceUrl"": ""https://example.com/prop/123"",
       ""price"": 4500,
@@ -1371,12 +1520,229 @@ Responde ÚNICAMENTE con JSON válido, sin texto adicional:
       ""publicationDate"": ""2026-01-15"",
       ""condition"": ""Usado"",
       ""isArriendo"": false
-    }}
+    }
   ]
-}}
+}
+
+";
+
+    /// <summary>
+    /// Modelo de Bedrock: la variable de entorno no cambia durante la vida del proceso.
+    /// </summary>
+    private static readonly string _bedrockModelId =
+        Environment.GetEnvironmentVariable("BEDROCK_MODEL_ID")
+        ?? "us.anthropic.claude-3-5-sonnet-20241022-v2:0";
+
+    // Una sola pasada por chunk: [link:URL] emitido por WalkNode (grupo "link")
+    // o campos "url: https://..." de datos embebidos (grupo "field").
+    // El tag [link:...] se consume completo, así que su "link:" interno no se
+    // vuelve a contar como campo.
+    [GeneratedRegex(@"\[link:(?<link>https?://[^\]]+)\]|(?:url|permalink|href|canonical(?:Url)?|link):\s*(?<field>https?://\S+)", RegexOptions.IgnoreCase)]
+    private static partial Regex ChunkUrlRegex();
+
+    /// <summary>
+    /// Llamadas a Bedrock en vuelo por ejecución. Casi todo el tiempo de un chunk
+    /// es espera de red, así que se lanzan los siguientes chunks mientras se
+    /// procesa el actual; el post-proceso (fallback de URLs, dedup, logs) sigue
+    /// siendo secuencial y en orden.
+    /// </summary>
+    private const int MaxConcurrentBedrockChunks = 3;
+
+    private async Task<List<Property>> ExtractPropertiesWithBedrock(string compactText, Bot bot)
+    {
+        if (IsMockScrapingEnabled())
+        {
+            await _botLogService.LogWarningAsync(bot.Id, bot.Name,
+                "Mock scraping enabled; returning synthetic properties without Bedrock.");
+            return BuildMockProperties(bot);
+        }
+
+        var modelId = _bedrockModelId;
+
+        // Encabezado del prompt (instrucciones + URL del bot): igual para todos
+        // los chunks de la ejecución, se arma una sola vez.
+        var promptHeader = string.Concat(PromptIntro, bot.Url, PromptInstructions, "TEXTO:\n");
+
+        var chunks = ChunkText(compactText, maxChunkSize: 10_000).ToList();
+        await _botLogService.LogInfoAsync(bot.Id, bot.Name,
+            $"📦 Content split into {chunks.Count} chunk(s) (model: {modelId})");
+
+        var allProperties = new List<Property>();
+        var seenKeys = new HashSet<string>(StringComparer.OrdinalIgnoreCase);
+
+        // Ventana deslizante: hasta MaxConcurrentBedrockChunks llamadas en curso.
+        // ProcessChunkWithBedrock no toca el DbContext, así que puede correr en
+        // paralelo con el chequeo de stop de este loop.
+        var inFlight = new Queue<Task<List<Property>>>();
+        var nextToStart = 0;
+
+        // Al salir (stop, excepción o fin normal) se cancelan y se esperan las
+        // llamadas que queden en vuelo: ninguna sigue llamando a Bedrock ni
+        // escribiendo logs después de que el bot quedó detenido.
+        using var inFlightCts = new CancellationTokenSource();
+        var ct = inFlightCts.Token;
+
+        try
+        {
+            for (int i = 0; i < chunks.Count; i++)
+            {
+                if (await IsBotStoppingAsync(bot.Id))
+                {
+                    await _botLogService.LogWarningAsync(bot.Id, bot.Name,
+                        $"⚠️ Stop signal between chunks ({i}/{chunks.Count}).");
+                    break;
+                }
+
+                while (nextToStart < chunks.Count && nextToStart < i + MaxConcurrentBedrockChunks)
+                {
+                    inFlight.Enqueue(ProcessChunkWithBedrock(chunks[nextToStart], nextToStart + 1, bot, modelId, promptHeader, ct));
+                    nextToStart++;
+                }
+
+                var preview = chunks[i].Length > 200 ? chunks[i][..200] + "…" : chunks[i];
+
+                // Recolectar URLs del chunk (diagnóstico + fallback por proximidad)
+                var chunkUrls = new List<(string Url, int Position)>();
+                int linkCount = 0, urlFieldCount = 0;
+                for (var m = ChunkUrlRegex().Match(chunks[i]); m.Success; m = m.NextMatch())
+                {
+                    var link = m.Groups["link"];
+                    if (link.Success) linkCount++; else urlFieldCount++;
+                    chunkUrls.Add(((link.Success ? link : m.Groups["field"]).Value.Trim(), m.Index));
+                }
+                await _botLogService.LogInfoAsync(bot.Id, bot.Name,
+                    $"🤖 Processing chunk {i + 1}/{chunks.Count} ({chunks[i].Length:N0} chars, {linkCount} [link:] tags, {urlFieldCount} url fields)...\nPreview: {preview}");
+
+                var chunkProperties = await inFlight.Dequeue();
+
+                // ── Fallback: asignar sourceUrl por proximidad en el texto ──
+                // Si Bedrock no extrajo el URL, buscamos el [link:URL] más cercano
+                // al título de la propiedad en el chunk original.
+                var propertiesWithoutUrl = chunkProperties.Where(p => string.IsNullOrWhiteSpace(p.SourceUrl)).ToList();
+                if (propertiesWithoutUrl.Count > 0 && (linkCount > 0 || urlFieldCount > 0))
+                {
+                    var allLinks = chunkUrls.DistinctBy(l => l.Url, StringComparer.OrdinalIgnoreCase);
+
+                    // No usar links que ya fueron asignados por Bedrock
+                    var usedUrls = new HashSet<string>(
+                        chunkProperties.Where(p => !string.IsNullOrWhiteSpace(p.SourceUrl))
+                                       .Select(p => p.SourceUrl!),
+                        StringComparer.OrdinalIgnoreCase);
+
+                    // Filtrar: no usar la URL del bot (es la página de listados)
+                    var botUrlNorm = bot.Url.Trim().TrimEnd('/');
+                    var availableLinks = allLinks
+                        .Where(l => !usedUrls.Contains(l.Url)
+                                 && !l.Url.Trim().TrimEnd('/').Equals(botUrlNorm, StringComparison.OrdinalIgnoreCase))
+                        .ToList();
+
+                    foreach (var prop in propertiesWithoutUrl)
+                    {
+                        if (availableLinks.Count == 0) break;
+                        if (string.IsNullOrWhiteSpace(prop.Title)) continue;
+
+                        // Buscar la posición del título en el chunk
+                        var titleIdx = chunks[i].IndexOf(prop.Title, StringComparison.OrdinalIgnoreCase);
+                        if (titleIdx < 0 && prop.Title.Length > 15)
+                        {
+                            // Intentar con un fragmento del título (primeras palabras)
+                            var titleFragment = prop.Title.Length > 30 ? prop.Title[..30] : prop.Title;
+                            titleIdx = chunks[i].IndexOf(titleFragment, StringComparison.OrdinalIgnoreCase);
+                        }
+
+                        if (titleIdx >= 0)
+                        {
+                            // Asignar el link más cercano al título: una pasada lineal,
+                            // sin ordenar la lista completa por cada propiedad
+                            var nearest = availableLinks.MinBy(l => Math.Abs(l.Position - titleIdx));
+
+                            prop.SourceUrl = nearest.Url;
+                            availableLinks.Remove(nearest);
+                        }
+                    }
+                }
+
+                // Diagnóstico: loguear sourceUrl de cada propiedad extraída
+                var chunkWithUrl = chunkProperties.Count(p => !string.IsNullOrWhiteSpace(p.SourceUrl));
+                if (chunkProperties.Count > 0 && chunkWithUrl == 0)
+                {
+                    await _botLogService.LogWarningAsync(bot.Id, bot.Name,
+                        $"⚠️ Chunk {i + 1}: {chunkProperties.Count} propiedades extraídas pero NINGUNA tiene sourceUrl (links en texto: {linkCount})");
+                }
+                else if (chunkProperties.Count > 0)
+                {
+                    await _botLogService.LogDebugAsync(bot.Id, bot.Name,
+                        $"🔗 Chunk {i + 1}: {chunkWithUrl}/{chunkProperties.Count} con sourceUrl. Ejemplo: {chunkProperties.FirstOrDefault(p => p.SourceUrl != null)?.SourceUrl ?? "n/a"}");
+                }
 
-TEXTO:
-{chunkText}";
+                int added = 0;
+                foreach (var prop in chunkProperties)
+                {
+                    // Key primaria: por URL (si existe). seenKeys ya compara sin
+                    // distinguir mayúsculas, así que la URL no se pasa a minúsculas.
+                    // Key secundaria: por título + ciudad + tipo, normalizados (sin
+                    // acentos, sin puntuación, espacios colapsados) para que
+                    // variaciones menores del LLM entre chunks no generen duplicados.
+                    // Ej: "Edificio en Las Condes" vs "Edificio Las Condes" → misma key.
+                    // Solo se normaliza el texto cuando no hay URL.
+                    var url = prop.SourceUrl.AsSpan().Trim();
+                    var key = !url.IsEmpty
+                        ? string.Concat("url:", url)
+                        : $"text:{NormalizeForDedup(prop.Title)}|{NormalizeForDedup(prop.City)}|{NormalizeForDedup(prop.PropertyType)}";
+
+                    if (seenKeys.Add(key))
+                    {
+                        allProperties.Add(prop);
+                        added++;
+                    }
+                }
+
+                await _botLogService.LogSuccessAsync(bot.Id, bot.Name,
+                    $"✅ Chunk {i + 1}: {chunkProperties.Count} found, {added} unique added");
+            }
+        }
+        finally
+        {
+            if (inFlight.Count > 0)
+            {
+                inFlightCts.Cancel();
+                try { await Task.WhenAll(inFlight); }
+                catch { /* resultados descartados: el loop ya terminó */ }
+            }
+        }
+
+        return allProperties;
+    }
+
+    /// <summary>
+    /// Tiempo que se conserva en memoria la respuesta de Bedrock para un chunk.
+    /// Re-ejecutar un bot sobre una página sin cambios produce los mismos chunks,
+    /// así que se evita volver a pagar la llamada al modelo.
+    /// </summary>
+    private static readonly TimeSpan _chunkCacheTtl = TimeSpan.FromHours(1);
+
+    // Fences ```json ... ``` que el modelo a veces agrega alrededor del JSON
+    [GeneratedRegex(@"^```json?\s*|```\s*$", RegexOptions.Multiline)]
+    private static partial Regex CodeFenceRegex();
+
+    private static string BuildChunkCacheKey(string modelId, string botUrl, string chunkText)
+    {
+        var hash = SHA256.HashData(Encoding.UTF8.GetBytes($"{modelId}\n{botUrl}\n{chunkText}"));
+        return "bedrock-chunk:" + Convert.ToHexString(hash);
+    }
+
+    private async Task<List<Property>> ProcessChunkWithBedrock(
+        string chunkText, int chunkNumber, Bot bot, string modelId, string promptHeader, CancellationToken ct)
+    {
+        var cacheKey = BuildChunkCacheKey(modelId, bot.Url, chunkText);
+        if (_cache.TryGetValue(cacheKey, out List<PropertyDto>? cached) && cached != null)
+        {
+            await _botLogService.LogDebugAsync(bot.Id, bot.Name,
+                $"♻️ Chunk {chunkNumber}: sin cambios, reutilizando respuesta de Bedrock en caché ({cached.Count} propiedades)");
+            return MapToProperties(cached);
+        }
+
+        var prompt = promptHeader + chunkText;
 
         var request = new ConverseRequest
         {
@@ -1402,7 +1768,7 @@ TEXTO:
         {
             try
             {
-                var response      = await _bedrockClient.ConverseAsync(request);
+                var response      = await _bedrockClient.ConverseAsync(request, ct);
                 var stopReason    = response?.StopReason ?? "unknown";
                 var contentBlocks = response?.Output?.Message?.Content;
 
@@ -1412,61 +1778,47 @@ TEXTO:
                     .FirstOrDefault();
 
                 await _botLogService.LogDebugAsync(bot.Id, bot.Name,
-                    $"🔍 Bedrock response: stopReason={stopReason}, textLength={jsonResponse?.Length ?? 0}");
+                    $"🔍 Chunk {chunkNumber}: Bedrock response: stopReason={stopReason}, textLength={jsonResponse?.Length ?? 0}");
 
                 if (string.IsNullOrWhiteSpace(jsonResponse))
                 {
                     await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                        $"⚠️ Bedrock returned no text (stopReason={stopReason})");
+                        $"⚠️ Chunk {chunkNumber}: Bedrock returned no text (stopReason={stopReason})");
                     return new List<Property>();
                 }
 
-                jsonResponse = Regex
-                    .Replace(jsonResponse, @"^```json?\s*|```\s*$", "", RegexOptions.Multiline)
-                    .Trim();
+                jsonResponse = CodeFenceRegex().Replace(jsonResponse, "").Trim();
 
-                var result = JsonSerializer.Deserialize<BedrockResponse>(jsonResponse, new JsonSerializerOptions
-                {
-                    PropertyNameCaseInsensitive = true
-                });
+                var result = JsonSerializer.Deserialize(jsonResponse, BedrockJsonContext.Default.BedrockResponse);
 
-                return result?.Properties?.Select(p => new Property
-                {
-                    Title        = p.Title ?? string.Empty,
-                    SourceUrl    = p.SourceUrl,
-                    Price        = p.Price,
-                    Currency     = p.Currency ?? "CLP",
-                    Address      = p.Address,
-                    City         = p.City,
-                    Region       = p.Region,
-                    Neighborhood = p.Neighborhood,
-                    Bedrooms     = p.Bedrooms,
-                    Bathrooms    = p.Bathrooms,
-                    Area         = p.Area,
-                    PropertyType    = p.PropertyType,
-                    Description     = p.Description,
-                    PublicationDate = p.PublicationDate,
-                    Condition       = p.Condition,
-                    IsArriendo      = p.IsArriendo
-                }).ToList() ?? new List<Property>();
+                var dtos = result?.Properties ?? new List<PropertyDto>();
+                _cache.Set(cacheKey, dtos, _chunkCacheTtl);
+
+                return MapToProperties(dtos);
+            }
+            catch (OperationCanceledException) when (ct.IsCancellationRequested)
+            {
+                // La ejecución terminó (stop o error) antes de usar este chunk
+                return new List<Property>();
             }
             catch (JsonException ex)
             {
                 await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                    $"⚠️ Invalid JSON from Bedrock: {ex.Message}. Chunk skipped.");
+                    $"⚠️ Chunk {chunkNumber}: Invalid JSON from Bedrock: {ex.Message}. Chunk skipped.");
                 return new List<Property>();
             }
-            catch (Exception ex) when (attempt < maxRetries)
+            catch (Exception ex) when (attempt < maxRetries && IsTransientBedrockError(ex))
             {
-                var delay = 2000 * (attempt + 1);
+                var delay = GetBedrockRetryDelayMs(attempt);
                 await _botLogService.LogWarningAsync(bot.Id, bot.Name,
-                    $"⚠️ Bedrock error (attempt {attempt + 1}): {ex.Message}. Retrying in {delay}ms...");
-                await Task.Delay(delay);
+                    $"⚠️ Chunk {chunkNumber}: Bedrock error (attempt {attempt + 1}): {ex.Message}. Retrying in {delay}ms...");
+                try { await Task.Delay(delay, ct); }
+                catch (OperationCanceledException) { return new List<Property>(); }
             }
             catch (Exception ex)
             {
                 await _botLogService.LogErrorAsync(bot.Id, bot.Name,
-                    $"❌ Bedrock API error ({ex.GetType().Name}): {ex.Message}", ex);
+                    $"❌ Chunk {chunkNumber}: Bedrock API error ({ex.GetType().Name}): {ex.Message}", ex);
                 return new List<Property>();
             }
         }
@@ -1474,6 +1826,101 @@ TEXTO:
         return new List<Property>();
     }
 
+    private const int BedrockRetryBaseDelayMs = 2_000;
+    private const int BedrockRetryMaxDelayMs  = 30_000;
+
+    /// <summary>
+    /// Backoff exponencial con jitter: base·2^intento (con tope), escalado por un
+    /// factor aleatorio entre 0.5 y 1. Con varios bots corriendo a la vez, un
+    /// throttling de Bedrock ya no hace que todos reintenten en el mismo instante.
+    /// </summary>
+    private static int GetBedrockRetryDelayMs(int attempt)
+    {
+        var exponential = Math.Min(BedrockRetryMaxDelayMs, BedrockRetryBaseDelayMs * (1 << attempt));
+        return (int)(exponential * (0.5 + Random.Shared.NextDouble() * 0.5));
+    }
+
+    /// <summary>
+    /// Errores que no se arreglan reintentando (request inválido, permisos,
+    /// modelo inexistente): se cortan de inmediato en vez de esperar el backoff.
+    /// </summary>
+    private static bool IsTransientBedrockError(Exception ex) =>
+        ex is not (ValidationException or AccessDeniedException or ResourceNotFoundException);
+
+    /// <summary>
+    /// Convierte los DTOs de Bedrock en entidades nuevas. Siempre crea instancias
+    /// frescas: los DTOs cacheados se comparten entre ejecuciones y las entidades
+    /// se mutan/trackean aguas abajo.
+    /// Valida una sola vez cada campo contra el esquema (largo de columnas,
+    /// precisión numérica, Kind de fechas): un valor fuera de rango del modelo
+    /// haría fallar el SaveChanges del lote completo en vez de una sola fila.
+    /// Antes de todo eso se descartan las filas basura (ver <see cref="IsPlausible"/>).
+    /// </summary>
+    private static List<Property> MapToProperties(List<PropertyDto> dtos) =>
+        dtos.Where(IsPlausible).Select(p => new Property
+        {
+            Title        = Clip(p.Title, 500) ?? string.Empty,
+            SourceUrl    = Clip(p.SourceUrl, 2000, truncate: false),
+            Price        = NonNegative(p.Price, 1e16m),
+            Currency     = Clip(p.Currency, 10) ?? "CLP",
+            Address      = Clip(p.Address, 500),
+            City         = Clip(p.City, 100),
+            Region       = Clip(p.Region, 100),
+            Neighborhood = Clip(p.Neighborhood, 200),
+            Bedrooms     = p.Bedrooms  is >= 0 ? p.Bedrooms  : null,
+            Bathrooms    = p.Bathrooms is >= 0 ? p.Bathrooms : null,
+            Area         = NonNegative(p.Area, 1e8m),
+            PropertyType    = Clip(p.PropertyType, 50),
+            Description     = string.IsNullOrWhiteSpace(p.Description) ? null : p.Description,
+            PublicationDate = AsUtc(p.PublicationDate),
+            Condition       = Clip(p.Condition, 20),
+            IsArriendo      = p.IsArriendo
+        }).ToList();
+
+    /// <summary>
+    /// Filtro barato previo a cualquier otro trabajo: una fila sin título ni URL
+    /// (ítems de navegación, placeholders que el modelo a veces devuelve) no se
+    /// puede identificar. Su fingerprint sería solo ciudad|tipo y colapsaría con
+    /// otras filas igual de vacías, así que no vale la pena validarla, deduplicarla
+    /// ni upsertearla.
+    /// </summary>
+    private static bool IsPlausible(PropertyDto p) =>
+        !string.IsNullOrWhiteSpace(p.Title) || !string.IsNullOrWhiteSpace(p.SourceUrl);
+
+    /// <summary>
+    /// Texto recortado; vacío → null. Si excede el largo de la columna se trunca,
+    /// salvo que truncar lo invalide (URLs): en ese caso se descarta.
+    /// </summary>
+    private static string? Clip(string? value, int maxLength, bool truncate = true)
+    {
+        if (string.IsNullOrWhiteSpace(value)) return null;
+
+        var trimmed = value.AsSpan().Trim();
+        if (trimmed.Length <= maxLength)
+            return trimmed.Length == value.Length ? value : trimmed.ToString();
+
+        return truncate ? trimmed[..maxLength].ToString() : null;
+    }
+
+    /// <summary>
+    /// Numéricos dentro de la precisión de la columna (decimal(18,2) / (10,2));
+    /// negativos o desbordados → null.
+    /// </summary>
+    private static decimal? NonNegative(decimal? value, decimal exclusiveMax) =>
+        value is >= 0 && value < exclusiveMax ? value : null;
+
+    /// <summary>
+    /// Las columnas son timestamp with time zone: Npgsql rechaza DateTime con
+    /// Kind Unspecified, que es lo que produce una fecha "2024-05-01" sin zona.
+    /// </summary>
+    private static DateTime? AsUtc(DateTime? value) => value switch
+    {
+        null => null,
+        { Kind: DateTimeKind.Utc } d   => d,
+        { Kind: DateTimeKind.Local } d => d.ToUniversalTime(),
+        var d => DateTime.SpecifyKind(d.Value, DateTimeKind.Utc),
+    };
+
     private static bool IsMockScrapingEnabled() =>
         string.Equals(
             Environment.GetEnvironmentVariable("SCRAPER_MOCK_MODE"),
@@ -1504,60 +1951,75 @@ TEXTO:
             }
         };
 
+    // Una sola pasada sobre la URL por cada inferencia: cada alternativa con
+    // nombre indica el resultado, sin ToLowerInvariant ni un Contains por palabra.
+    [GeneratedRegex(@"(?<nuevo>nuevo|estrenar|/new)|(?<usado>usado|segunda-mano|/used)", RegexOptions.IgnoreCase | RegexOptions.CultureInvariant)]
+    private static partial Regex ConditionUrlRegex();
+
+    [GeneratedRegex(@"(?<arriendo>arriendo|alquiler|renta|/rent|arrendar)|(?<venta>venta|compra|/sale)", RegexOptions.IgnoreCase | RegexOptions.CultureInvariant)]
+    private static partial Regex ArriendoUrlRegex();
+
     /// <summary>
     /// Infiere la condición (Nuevo/Usado) a partir de la URL del bot.
+    /// "Nuevo" tiene prioridad si la URL contiene indicadores de ambos.
     /// </summary>
     private static string? InferConditionFromUrl(string? url)
     {
         if (string.IsNullOrWhiteSpace(url)) return null;
-        var lower = url.ToLowerInvariant();
 
-        if (lower.Contains("nuevo") || lower.Contains("estrenar") || lower.Contains("/new"))
-            return "Nuevo";
-        if (lower.Contains("usado") || lower.Contains("segunda-mano") || lower.Contains("/used"))
-            return "Usado";
+        string? result = null;
+        for (var m = ConditionUrlRegex().Match(url); m.Success; m = m.NextMatch())
+        {
+            if (m.Groups["nuevo"].Success) return "Nuevo";
+            result = "Usado";
+        }
 
-        return null;
+        return result;
     }
 
     /// <summary>
     /// Infiere si es arriendo o venta a partir de la URL del bot.
+    /// Arriendo tiene prioridad si la URL contiene indicadores de ambos.
     /// </summary>
     private static bool? InferIsArriendoFromUrl(string? url)
     {
         if (string.IsNullOrWhiteSpace(url)) return null;
-        var lower = url.ToLowerInvariant();
 
-        if (lower.Contains("arriendo") || lower.Contains("alquiler") || lower.Contains("renta")
-            || lower.Contains("/rent") || lower.Contains("arrendar"))
-            return true;
-        if (lower.Contains("venta") || lower.Contains("compra") || lower.Contains("/sale")
-            || lower.Contains("comprar"))
-            return false;
+        bool? result = null;
+        for (var m = ArriendoUrlRegex().Match(url); m.Success; m = m.NextMatch())
+        {
+            if (m.Groups["arriendo"].Success) return true;
+            result = false;
+        }
 
-        return null;
+        return result;
     }
 
     /// <summary>
     /// Normaliza texto para deduplicación en memoria: lowercase, sin acentos,
-    /// sin puntuación, espacios colapsados.
+    /// sin puntuación, espacios colapsados. Misma normalización que el upsert.
     /// </summary>
-    private static string NormalizeForDedup(string? text)
-    {
-        if (string.IsNullOrWhiteSpace(text)) return "";
-        var s = text.Trim().ToLowerInvariant();
-        s = s.Replace("á", "a").Replace("é", "e").Replace("í", "i")
-             .Replace("ó", "o").Replace("ú", "u").Replace("ñ", "n")
-             .Replace("ü", "u");
-        s = System.Text.RegularExpressions.Regex.Replace(s, @"[^\w\s]", " ");
-        s = System.Text.RegularExpressions.Regex.Replace(s, @"\s+", " ").Trim();
-        return s;
-    }
+    private static string NormalizeForDedup(string? text) => PropertyUpsertService.NormalizeText(text);
 
     // ══════════════════════════════════════════════════════════════════════
     // DTOs internos para Bedrock
     // ══════════════════════════════════════════════════════════════════════
 
+    /// <summary>
+    /// Contexto de System.Text.Json generado en compilación: el deserializador de
+    /// la respuesta de Bedrock no se arma por reflexión en runtime.
+    /// AllowReadingFromString: los números que ya vienen como número se leen
+    /// directo; si el modelo devuelve "4500" entre comillas se convierte en vez
+    /// de lanzar JsonException y descartar el chunk completo.
+    /// </summary>
+    [JsonSourceGenerationOptions(
+        PropertyNameCaseInsensitive = true,
+        NumberHandling = JsonNumberHandling.AllowReadingFromString)]
+    [JsonSerializable(typeof(BedrockResponse))]
+    private partial class BedrockJsonContext : JsonSerializerContext
+    {
+    }
+
     private class BedrockResponse
     {
         public List<PropertyDto>? Properties { get; set; }